@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+
+"""
+Facts about glsl types that the tooling needs when reasoning about shaders,
+keyed by the type name exactly as it appears in a shader eg) vec3, sampler2D
+"""
+
+
+@dataclass
+class GLSLTypeInfo:
+    component_count: int
+    # opaque types (samplers) can't hold data, they only refer to a texture unit
+    is_opaque: bool = False
+    # the c++ type with the same memory layout, empty when there isn't one
+    cpp_type: str = ""
+    # alignment and size of a member of a std140 uniform block, a size of 0 means the c++ type can't
+    # be used to mirror a block member of this type (eg. glm::mat3 has no padding between columns)
+    std140_alignment: int = 0
+    std140_size: int = 0
+    # the call that uploads a value of the c++ type to a uniform, {location} and {value} are filled in,
+    # empty when the tooling doesn't upload this type
+    gl_uniform_call: str = ""
+
+
+glsl_type_to_info = {
+    "bool": GLSLTypeInfo(1),
+    "int": GLSLTypeInfo(1, cpp_type="int", std140_alignment=4, std140_size=4, gl_uniform_call="glUniform1i({location}, {value})"),
+    "uint": GLSLTypeInfo(1, cpp_type="unsigned int", std140_alignment=4, std140_size=4, gl_uniform_call="glUniform1ui({location}, {value})"),
+    "float": GLSLTypeInfo(1, cpp_type="float", std140_alignment=4, std140_size=4, gl_uniform_call="glUniform1f({location}, {value})"),
+    "bvec2": GLSLTypeInfo(2),
+    "bvec3": GLSLTypeInfo(3),
+    "bvec4": GLSLTypeInfo(4),
+    "ivec2": GLSLTypeInfo(2, cpp_type="glm::ivec2", std140_alignment=8, std140_size=8, gl_uniform_call="glUniform2iv({location}, 1, glm::value_ptr({value}))"),
+    "ivec3": GLSLTypeInfo(3, cpp_type="glm::ivec3", std140_alignment=16, std140_size=12, gl_uniform_call="glUniform3iv({location}, 1, glm::value_ptr({value}))"),
+    "ivec4": GLSLTypeInfo(4, cpp_type="glm::ivec4", std140_alignment=16, std140_size=16, gl_uniform_call="glUniform4iv({location}, 1, glm::value_ptr({value}))"),
+    "uvec2": GLSLTypeInfo(2, cpp_type="glm::uvec2", std140_alignment=8, std140_size=8, gl_uniform_call="glUniform2uiv({location}, 1, glm::value_ptr({value}))"),
+    "uvec3": GLSLTypeInfo(3, cpp_type="glm::uvec3", std140_alignment=16, std140_size=12, gl_uniform_call="glUniform3uiv({location}, 1, glm::value_ptr({value}))"),
+    "uvec4": GLSLTypeInfo(4, cpp_type="glm::uvec4", std140_alignment=16, std140_size=16, gl_uniform_call="glUniform4uiv({location}, 1, glm::value_ptr({value}))"),
+    "vec2": GLSLTypeInfo(2, cpp_type="glm::vec2", std140_alignment=8, std140_size=8, gl_uniform_call="glUniform2fv({location}, 1, glm::value_ptr({value}))"),
+    "vec3": GLSLTypeInfo(3, cpp_type="glm::vec3", std140_alignment=16, std140_size=12, gl_uniform_call="glUniform3fv({location}, 1, glm::value_ptr({value}))"),
+    "vec4": GLSLTypeInfo(4, cpp_type="glm::vec4", std140_alignment=16, std140_size=16, gl_uniform_call="glUniform4fv({location}, 1, glm::value_ptr({value}))"),
+    "mat2": GLSLTypeInfo(4, cpp_type="glm::mat2", gl_uniform_call="glUniformMatrix2fv({location}, 1, GL_FALSE, glm::value_ptr({value}))"),
+    "mat3": GLSLTypeInfo(9, cpp_type="glm::mat3", gl_uniform_call="glUniformMatrix3fv({location}, 1, GL_FALSE, glm::value_ptr({value}))"),
+    "mat4": GLSLTypeInfo(16, cpp_type="glm::mat4", std140_alignment=16, std140_size=64, gl_uniform_call="glUniformMatrix4fv({location}, 1, GL_FALSE, glm::value_ptr({value}))"),
+    "sampler1D": GLSLTypeInfo(1, True),
+    "sampler2D": GLSLTypeInfo(1, True),
+    "sampler3D": GLSLTypeInfo(1, True),
+    "samplerCube": GLSLTypeInfo(1, True),
+    "sampler2DArray": GLSLTypeInfo(1, True),
+    "sampler2DShadow": GLSLTypeInfo(1, True),
+    "isampler2D": GLSLTypeInfo(1, True),
+    "usampler2D": GLSLTypeInfo(1, True),
+}
+
+
+# the numpy scalar type with the same memory layout as each opengl component type
+gl_data_type_to_numpy_type = {
+    "GL_BYTE": "int8",
+    "GL_UNSIGNED_BYTE": "uint8",
+    "GL_SHORT": "int16",
+    "GL_UNSIGNED_SHORT": "uint16",
+    "GL_INT": "int32",
+    "GL_UNSIGNED_INT": "uint32",
+    "GL_HALF_FLOAT": "float16",
+    "GL_FLOAT": "float32",
+    "GL_DOUBLE": "float64",
+}
@@ -1,10 +1,24 @@
 from standard import *
 from colored_print import *
+from shader_cost import *
+from gl_types import gl_data_type_to_numpy_type, glsl_type_to_info
 import argparse
 from enum import Enum
-from typing import Tuple
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+import json
+import tempfile
 import re
 import os
+import sys
+
+
+# generated files go next to this script unless told otherwise
+default_output_directory = os.path.dirname(os.path.abspath(__file__))
+default_shader_directory = "../../assets/shaders/"
+
+# the modules of this tool, changing any of them can change the generated files
+tool_module_names = ["standard", "standard_registry", "gl_types", "shader_cost", "colored_print"]
 
 
 def extract_variables_from_shader(shader_code: str):
@@ -14,79 +28,201 @@ def extract_variables_from_shader(shader_code: str):
     """
     uniform_pattern = r"uniform\s+(\w+)\s+(\w+);"
     attribute_pattern = r"in\s+(\w+)\s+(\w+);"  # GLSL version 330 core uses 'in' for attributes
+    layout_uniform_pattern = r"layout\s*\(([^)]*)\)\s*uniform\s+(\w+)\s+(\w+);"
 
     uniforms = re.findall(uniform_pattern, shader_code)
     attributes = re.findall(attribute_pattern, shader_code)
+    layout_uniforms = re.findall(layout_uniform_pattern, shader_code)
+    layout_attribute_pattern = r"layout\s*\(([^)]*)\)\s*in\s+(\w+)\s+(\w+);"
+    layout_attributes = re.findall(layout_attribute_pattern, shader_code)
+    uniform_block_pattern = r"(?:layout\s*\(([^)]*)\)\s*)?uniform\s+(\w+)\s*\{([^}]*)\}\s*\w*\s*;"
+    block_member_pattern = r"(\w+)\s+(\w+)\s*(?:\[\s*\w+\s*\])?\s*;"
+
+    uniform_blocks = {}
+    for qualifiers, block_name, body in re.findall(uniform_block_pattern, shader_code):
+        uniform_blocks[block_name] = {
+            "layout": qualifiers,
+            "members": re.findall(block_member_pattern, body),
+        }
 
     return {
         "uniforms": {name: v_type for v_type, name in uniforms},
         "attributes": {name: v_type for v_type, name in attributes},
+        "uniform_bindings": get_layout_qualifier_values(layout_uniforms, "binding"),
+        "attribute_locations": get_layout_qualifier_values(layout_attributes, "location"),
+        "uniform_blocks": uniform_blocks,
     }
 
-def validate_types(shader_variables, verbose):
+def get_layout_qualifier_values(layout_declarations, qualifier: str):
+    """
+    Given (qualifiers, type, name) matches of layout(...) declarations returns the integer value
+    of the qualifier for every declaration that sets it eg) layout(binding = 2) -> {name: 2}
+    """
+    name_to_value = {}
+    for qualifiers, _, name in layout_declarations:
+        match = re.search(rf"\b{qualifier}\s*=\s*(\d+)", qualifiers)
+        if match:
+            name_to_value[name] = int(match.group(1))
+    return name_to_value
+
+def validate_types(shader_variables, verbose, printed_lines: Optional[list] = None):
     """
     Validates the types of uniforms and attributes against expected types from dictionaries.
+    :param printed_lines: Collects every (message, color) that gets printed so it can be printed again.
     """
     valid_uniforms = []
     valid_attributes = []
+    errors = []
+
+    def report(message: str, color):
+        colored_print(message, color)
+        if printed_lines is not None:
+            printed_lines.append((message, color))
+
+    def report_error(message: str):
+        report(message, TextColor.RED)
+        errors.append(message.strip())
+
     # Check uniforms
     for name, v_type in shader_variables['uniforms'].items():
         # Get the expected type based on the key from shader_uniform_variable_to_data
-        expected_type = None
-        for uniform_var in shader_uniform_variable_to_data.keys():
-            if uniform_var.name == name.upper():  # Compare enum names to shader variable names
-                expected_type = shader_uniform_variable_to_data[uniform_var]
-                break
+        uniform_var = ShaderUniformVariable.__members__.get(name.upper())  # Compare enum names to shader variable names
+        expected_type = shader_uniform_variable_to_data.get(uniform_var)
 
         if expected_type:
             if expected_type.glsl_type != v_type:
-                colored_print(f"    Error: Uniform '{name}' expected type '{expected_type.glsl_type}' but found '{v_type}', fix the type in the shader.", TextColor.RED)
+                report_error(f"    Error: Uniform '{name}' expected type '{expected_type.glsl_type}' but found '{v_type}', fix the type in the shader.")
+            elif expected_type.texture_unit is not None and shader_variables['uniform_bindings'].get(name, expected_type.texture_unit) != expected_type.texture_unit:
+                report_error(f"    Error: Sampler '{name}' is bound to unit {shader_variables['uniform_bindings'][name]} but the standard assigns it unit {expected_type.texture_unit}, fix the binding in the shader.")
             else:
                 valid_uniforms.append(name.upper())
                 if verbose:
-                    colored_print(f"    Verified uniform '{name}' with type '{v_type}'.", TextColor.WHITE)
+                    report(f"    Verified uniform '{name}' with type '{v_type}'.", TextColor.WHITE)
+                if uniform_var in shader_uniform_variable_to_block:
+                    block_data = shader_uniform_block_to_data[shader_uniform_variable_to_block[uniform_var]]
+                    report(f"    Warning: Uniform '{name}' belongs to the uniform block '{block_data.glsl_name}', declare the block instead so its data is uploaded once for all programs.", TextColor.YELLOW)
         else:
-            colored_print(f"    ERROR: Uniform '{name}' is not recognized, you either have a typo or you need to register the new attribute in the standard.", TextColor.RED)
+            report_error(f"    ERROR: Uniform '{name}' is not recognized, you either have a typo or you need to register the new attribute in the standard.")
 
     # Check attributes
     for name, v_type in shader_variables['attributes'].items():
-        expected_data = None
-        for attrib_var in shader_vertex_attribute_to_data.keys():
-            if attrib_var.name == name.upper():  # Compare enum names to shader variable names
-                expected_data = shader_vertex_attribute_to_data[attrib_var]
-                break
+        attrib_var = ShaderVertexAttributeVariable.__members__.get(name.upper())  # Compare enum names to shader variable names
+        expected_data = shader_vertex_attribute_to_data.get(attrib_var)
 
         if expected_data:
+            expected_configuration = vertex_attribute_to_configuration.get(attrib_var)
             if expected_data.glsl_type != v_type:
-                colored_print(f"    Error: Attribute '{name}' expected type '{expected_data.glsl_type}' but found '{v_type}', fix the type in the shader.", TextColor.RED)
+                report_error(f"    Error: Attribute '{name}' expected type '{expected_data.glsl_type}' but found '{v_type}', fix the type in the shader.")
+            elif expected_configuration is not None and shader_variables['attribute_locations'].get(name, expected_configuration.location) != expected_configuration.location:
+                report_error(f"    Error: Attribute '{name}' is at location {shader_variables['attribute_locations'][name]} but the standard assigns it location {expected_configuration.location}, fix the location in the shader.")
             else: 
                 valid_attributes.append(name.upper())
                 if verbose:
-                    colored_print(f"    Verified attribute '{name}' with type '{v_type}'", TextColor.GRAY)
+                    report(f"    Verified attribute '{name}' with type '{v_type}'", TextColor.GRAY)
         else:
-            colored_print(f"    ERROR: Attribute '{name}' is not recognized, you either have a typo or you need to register the new attribute in the standard.", TextColor.RED)
+            report_error(f"    ERROR: Attribute '{name}' is not recognized, you either have a typo or you need to register the new attribute in the standard.")
+
+    # Check uniform blocks, any block holding a member of a block in the standard has to be declared exactly as the standard says
+    valid_uniform_blocks = []
+    for block_name, declaration in shader_variables['uniform_blocks'].items():
+        member_blocks = []
+        for _, member_name in declaration['members']:
+            member_var = ShaderUniformVariable.__members__.get(member_name.upper())
+            if member_var in shader_uniform_variable_to_block and shader_uniform_variable_to_block[member_var] not in member_blocks:
+                member_blocks.append(shader_uniform_variable_to_block[member_var])
+
+        if not member_blocks:
+            # not a block from the standard, eg) the local to world matrices of the ubo shaders
+            continue
+        if len(member_blocks) > 1:
+            report_error(f"    Error: Uniform block '{block_name}' mixes members of the blocks {[block.name for block in member_blocks]}, declare each of them separately.")
+            continue
 
-    return valid_attributes, valid_uniforms
+        block = member_blocks[0]
+        block_data = shader_uniform_block_to_data[block]
+        expected_members = [(shader_uniform_variable_to_data[member].glsl_type, member.name.lower()) for member in block_data.members]
+        declared_binding = get_layout_qualifier_values([(declaration['layout'], None, block_name)], "binding").get(block_name, block_data.binding)
 
-def validate_shader(shader_code: str, shader_program: ShaderProgram, verbose: bool) -> Tuple:
+        if block_name != block_data.glsl_name:
+            report_error(f"    Error: Uniform block '{block_name}' holds the members of {block.name} so it must be called '{block_data.glsl_name}'.")
+        elif declaration['members'] != expected_members:
+            expected_declaration = " ".join(f"{v_type} {name};" for v_type, name in expected_members)
+            report_error(f"    Error: Uniform block '{block_name}' must declare exactly {{ {expected_declaration} }} in that order.")
+        elif not re.search(r"\bstd140\b", declaration['layout']):
+            report_error(f"    Error: Uniform block '{block_name}' must use layout(std140) so that every program shares the same memory layout.")
+        elif declared_binding != block_data.binding:
+            report_error(f"    Error: Uniform block '{block_name}' is bound to {declared_binding} but the standard assigns it binding {block_data.binding}.")
+        else:
+            valid_uniform_blocks.append(block.name)
+            if verbose:
+                report(f"    Verified uniform block '{block_name}'.", TextColor.WHITE)
+
+    return valid_attributes, valid_uniforms, errors, valid_uniform_blocks
+
+@dataclass
+class ShaderSourceCache:
+    """
+    Shares work between validation runs in the same process, files are only read once per path and
+    identical source code is only parsed and validated once, even if it lives in different projects.
+    """
+    path_to_code: dict = field(default_factory=dict)
+    # paths that were looked for and not found, creating one of them should trigger a rebuild
+    missing_paths: list = field(default_factory=list)
+    code_to_validation: dict = field(default_factory=dict)
+    files_read: int = 0
+    sources_validated: int = 0
+    validations_reused: int = 0
+
+def read_shader_source(shader_path: str, shader_source_cache: ShaderSourceCache) -> str:
+    real_path = os.path.realpath(shader_path)
+    if real_path not in shader_source_cache.path_to_code:
+        try:
+            with open(shader_path, 'r') as shader_file:
+                shader_source_cache.path_to_code[real_path] = shader_file.read()
+        except FileNotFoundError:
+            if real_path not in shader_source_cache.missing_paths:
+                shader_source_cache.missing_paths.append(real_path)
+            raise
+        shader_source_cache.files_read += 1
+    return shader_source_cache.path_to_code[real_path]
+
+def validate_shader(shader_code: str, shader_program: ShaderProgram, verbose: bool, shader_source_cache: Optional[ShaderSourceCache] = None) -> Tuple:
     """
     Validates a shader file by logging issues if found.
     """
+    # what gets printed depends on verbose, so it's part of what makes two validations the same
+    cache_key = (shader_code, verbose)
+    if shader_source_cache is not None and cache_key in shader_source_cache.code_to_validation:
+        shader_source_cache.validations_reused += 1
+        shader_variables, valid_attrib_unifs, printed_lines = shader_source_cache.code_to_validation[cache_key]
+        # the output still belongs in the log of whoever is validating this copy of the source
+        for message, color in printed_lines:
+            colored_print(message, color)
+        return shader_variables, valid_attrib_unifs
+
     shader_variables = extract_variables_from_shader(shader_code)
 
     # Validate types
-    valid_attrib_unifs = validate_types(shader_variables, verbose)
+    printed_lines = []
+    valid_attrib_unifs = validate_types(shader_variables, verbose, printed_lines)
+
+    if shader_source_cache is not None:
+        shader_source_cache.sources_validated += 1
+        shader_source_cache.code_to_validation[cache_key] = (shader_variables, valid_attrib_unifs, printed_lines)
 
     return shader_variables, valid_attrib_unifs  # Return the variables for later use
 
-def validate_all_shaders(shader_catalog, shader_directory, verbose: bool, output_info: bool):
+def validate_all_shaders(shader_catalog, shader_directory, verbose: bool, output_info: bool, shader_source_cache: Optional[ShaderSourceCache] = None):
     """
     Iterates over all shaders in the shader catalog and validates them.
     :param shader_catalog: Dictionary mapping ShaderType to ShaderProgram instances.
     :param shader_directory: The directory where shader files are located.
     :param output_info: Whether to output shader variable information.
+    :param shader_source_cache: Lets several calls share the files they read and the results of validating them.
     """
     shader_info = {}
+    if shader_source_cache is None:
+        shader_source_cache = ShaderSourceCache()
 
     for shader_type, shader_program in shader_catalog.items():
         # Construct the full file paths
@@ -95,15 +231,13 @@ def validate_all_shaders(shader_catalog, shader_directory, verbose: bool, output
 
         # Load shader files from disk
         try:
-            with open(vertex_shader_path, 'r') as vertex_shader_file:
-                vertex_shader_code = vertex_shader_file.read()
+            vertex_shader_code = read_shader_source(vertex_shader_path, shader_source_cache)
         except FileNotFoundError:
             colored_print(f"Error: Vertex shader file '{vertex_shader_path}' not found.", TextColor.RED)
             continue
 
         try:
-            with open(fragment_shader_path, 'r') as fragment_shader_file:
-                fragment_shader_code = fragment_shader_file.read()
+            fragment_shader_code = read_shader_source(fragment_shader_path, shader_source_cache)
         except FileNotFoundError:
             colored_print(f"Error: Fragment shader file '{fragment_shader_path}' not found.", TextColor.RED)
             continue
@@ -112,10 +246,10 @@ def validate_all_shaders(shader_catalog, shader_directory, verbose: bool, output
         
         # Validate shaders
         colored_print(f"  Validating vertex shader: {shader_program.vertex_shader_filename}", TextColor.GREEN)
-        vertex_variables, valid_attrib_unifs = validate_shader(vertex_shader_code, shader_program, verbose)
+        vertex_variables, valid_attrib_unifs = validate_shader(vertex_shader_code, shader_program, verbose, shader_source_cache)
         
         colored_print(f"  Validating fragment shader: {shader_program.fragment_shader_filename}", TextColor.GREEN)
-        fragment_variables, valid_frag_attrib_unifs = validate_shader(fragment_shader_code, shader_program, verbose)
+        fragment_variables, valid_frag_attrib_unifs = validate_shader(fragment_shader_code, shader_program, verbose, shader_source_cache)
 
 
         all_valid_uniforms = valid_attrib_unifs[1] + valid_frag_attrib_unifs[1]
@@ -127,6 +261,12 @@ def validate_all_shaders(shader_catalog, shader_directory, verbose: bool, output
             "uniforms": vertex_variables['uniforms'],
             "valid_attributes": valid_attrib_unifs[0],
             "valid_uniforms": all_valid_uniforms,
+            "valid_uniform_blocks": list(dict.fromkeys(valid_attrib_unifs[3] + valid_frag_attrib_unifs[3])),
+            "errors": valid_attrib_unifs[2] + valid_frag_attrib_unifs[2],
+            "vertex_shader_path": vertex_shader_path,
+            "fragment_shader_path": fragment_shader_path,
+            "vertex_shader_code": vertex_shader_code,
+            "fragment_shader_code": fragment_shader_code,
         }
 
     if output_info:
@@ -143,7 +283,232 @@ def validate_all_shaders(shader_catalog, shader_directory, verbose: bool, output
 
     return shader_info
 
-def generate_cpp(shader_info):
+def write_file_if_changed(path: str, content: str) -> bool:
+    """
+    Atomically replaces the file with the content, unless it already holds exactly that content in
+    which case it isn't touched, so its mtime stays the same and nothing that depends on it rebuilds.
+    :return: Whether the file was written.
+    """
+    try:
+        with open(path, 'r', newline='') as existing_file:
+            if existing_file.read() == content:
+                return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+
+    # the temporary file has to be on the same filesystem for the replace to be atomic
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp_")
+    try:
+        with os.fdopen(file_descriptor, 'w', newline='') as temporary_file:
+            temporary_file.write(content)
+        # mkstemp makes the file private, give it the permissions open() would have
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temporary_path, 0o666 & ~umask)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    return True
+
+def escape_depfile_path(path: str) -> str:
+    return path.replace(" ", "\\ ").replace("#", "\\#").replace("$", "$$")
+
+def write_depfile(depfile_path: str, targets, shader_source_cache: ShaderSourceCache, extra_dependencies=()) -> bool:
+    """
+    Writes a make style depfile (which ninja also reads) saying that the generated files depend on
+    every shader source that was read or looked for, the standard definition and the modules of this tool.
+    Like gcc -MP every shader source also gets an empty rule, so make doesn't stop when one is deleted
+    and a missing one doesn't stop the build before the tool gets to report it.
+    """
+    shader_paths = list(shader_source_cache.path_to_code) + shader_source_cache.missing_paths
+    dependencies = list(shader_paths)
+    dependencies.extend(os.path.abspath(path) for path in extra_dependencies)
+    dependencies.append(os.path.abspath(standard_definition_path))
+    dependencies.append(os.path.abspath(__file__))
+    dependencies.extend(os.path.abspath(sys.modules[module_name].__file__) for module_name in tool_module_names)
+
+    lines = [" ".join(escape_depfile_path(target) for target in targets) + ": \\"]
+    lines.extend(f"  {escape_depfile_path(dependency)} \\" for dependency in dict.fromkeys(dependencies))
+    lines[-1] = lines[-1][:-2]
+    lines.extend(f"\n{escape_depfile_path(shader_path)}:" for shader_path in shader_paths)
+    return write_file_if_changed(depfile_path, "\n".join(lines) + "\n")
+
+def get_uniform_block_struct_name(block) -> str:
+    return "".join(word.capitalize() for word in block.name.split("_")) + "UniformBlock"
+
+def get_uniform_block_binding_constant_name(block) -> str:
+    return f"{block.name}_UNIFORM_BLOCK_BINDING"
+
+def generate_uniform_block_struct(block, block_data):
+    """
+    Generates a c++ struct with the std140 layout of a uniform block, padding is spelled out so the
+    struct matches the block byte for byte, along with the binding point of the block.
+    """
+    struct_name = get_uniform_block_struct_name(block)
+    lines = [f"constexpr GLuint {get_uniform_block_binding_constant_name(block)} = {block_data.binding};"]
+    lines.append(f"struct {struct_name} {{")
+
+    offset = 0
+    padding_count = 0
+    member_offsets = []
+    for member in block_data.members:
+        type_info = glsl_type_to_info[shader_uniform_variable_to_data[member].glsl_type]
+        aligned_offset = -(-offset // type_info.std140_alignment) * type_info.std140_alignment
+        if aligned_offset != offset:
+            lines.append(f"    float padding_{padding_count}[{(aligned_offset - offset) // 4}];")
+            padding_count += 1
+        lines.append(f"    {type_info.cpp_type} {member.name.lower()};")
+        member_offsets.append((member.name.lower(), aligned_offset))
+        offset = aligned_offset + type_info.std140_size
+
+    # the size of a block is rounded up to a multiple of a vec4
+    block_size = -(-offset // 16) * 16
+    if block_size != offset:
+        lines.append(f"    float padding_{padding_count}[{(block_size - offset) // 4}];")
+    lines.append("};")
+
+    for member_name, member_offset in member_offsets:
+        lines.append(f"static_assert(offsetof({struct_name}, {member_name}) == {member_offset}, \"{struct_name} must match the std140 layout\");")
+    lines.append(f"static_assert(sizeof({struct_name}) == {block_size}, \"{struct_name} must match the std140 layout\");")
+    return lines
+
+def get_shader_uniforms_struct_name(shader_type) -> str:
+    return "".join(word.capitalize() for word in shader_type.name.split("_")) + "Uniforms"
+
+def generate_shader_uniforms_struct(shader_type, uniforms):
+    """
+    Generates a c++ struct that remembers the last value uploaded to each uniform of a shader type,
+    its setters skip the glUniform call when the value didn't change. Samplers aren't included since
+    their texture unit is set once after linking, and neither are types without a glUniform call.
+    """
+    struct_name = get_shader_uniforms_struct_name(shader_type)
+    uploadable_uniforms = []
+    for uniform in uniforms:
+        type_info = glsl_type_to_info.get(shader_uniform_variable_to_data[uniform].glsl_type)
+        if type_info is not None and type_info.gl_uniform_call:
+            uploadable_uniforms.append((uniform.name.lower(), type_info))
+
+    lines = [f"struct {struct_name} {{"]
+    lines.append("    UniformUploadCounters upload_counters;")
+    lines.append("")
+    lines.append(f"    explicit {struct_name}(GLuint program_id) {{ invalidate(program_id); }}")
+
+    # glUniform* writes to the program in use, so the setters must only be called while it is bound
+    for name, type_info in uploadable_uniforms:
+        upload = type_info.gl_uniform_call.format(location=f"{name}_location", value="value")
+        lines.append("")
+        lines.append(f"    void set_{name}(const {type_info.cpp_type} &value) {{")
+        lines.append(f"        if ({name}_is_uploaded && {name} == value) {{")
+        lines.append("            upload_counters.skipped++;")
+        lines.append("            return;")
+        lines.append("        }")
+        lines.append(f"        {upload};")
+        lines.append(f"        {name} = value;")
+        lines.append(f"        {name}_is_uploaded = true;")
+        lines.append("        upload_counters.issued++;")
+        lines.append("    }")
+
+    lines.append("")
+    lines.append("    // forget what was uploaded and look the locations up again, call it after the program is relinked")
+    lines.append("    void invalidate(GLuint program_id) {")
+    for name, _ in uploadable_uniforms:
+        lines.append(f"        {name}_location = glGetUniformLocation(program_id, \"{name}\");")
+        lines.append(f"        {name}_is_uploaded = false;")
+    lines.append("    }")
+
+    if uploadable_uniforms:
+        lines.append("")
+        lines.append("private:")
+    for name, type_info in uploadable_uniforms:
+        lines.append(f"    GLint {name}_location = -1;")
+        lines.append(f"    {type_info.cpp_type} {name}{{}};")
+        lines.append(f"    bool {name}_is_uploaded = false;")
+    lines.append("};")
+    return lines
+
+def get_shader_batch_struct_name(shader_type) -> str:
+    return "".join(word.capitalize() for word in shader_type.name.split("_")) + "Batch"
+
+def generate_shader_batch_struct(shader_type, attributes):
+    """
+    Generates a c++ struct holding the vertices of a shader type as one vector per attribute, named by
+    the plural names in shader_vertex_attribute_to_data, along with the indices into them.
+    Only attributes that are bound to opengl are included.
+    """
+    index_data = shader_vertex_attribute_to_data[ShaderVertexAttributeVariable.INDEX]
+    attribute_datas = [
+        shader_vertex_attribute_to_data[attribute] for attribute in attributes
+        if attribute in vertex_attribute_to_configuration and shader_vertex_attribute_to_data[attribute].plural_name
+    ]
+    if not attribute_datas:
+        return []
+
+    struct_name = get_shader_batch_struct_name(shader_type)
+    lines = [f"struct {struct_name} {{"]
+    lines.append(f"    std::vector<{index_data.attrib_type}> {index_data.plural_name};")
+    for data in attribute_datas:
+        lines.append(f"    std::vector<{data.attrib_type}> {data.plural_name};")
+
+    lines.append("")
+    lines.append("    void reserve(size_t vertex_count, size_t index_count) {")
+    lines.append(f"        {index_data.plural_name}.reserve(index_count);")
+    for data in attribute_datas:
+        lines.append(f"        {data.plural_name}.reserve(vertex_count);")
+    lines.append("    }")
+
+    lines.append("")
+    lines.append("    // keeps the memory around so filling the batch again doesn't allocate")
+    lines.append("    void clear() {")
+    lines.append(f"        {index_data.plural_name}.clear();")
+    for data in attribute_datas:
+        lines.append(f"        {data.plural_name}.clear();")
+    lines.append("    }")
+
+    lines.append("")
+    lines.append(f"    size_t vertex_count() const {{ return {attribute_datas[0].plural_name}.size(); }}")
+
+    # the indices of a mesh start at 0, so they are offset by the vertices already in the batch
+    parameters = [f"const std::vector<{index_data.attrib_type}> &new_{index_data.plural_name}"]
+    parameters += [f"const std::vector<{data.attrib_type}> &new_{data.plural_name}" for data in attribute_datas]
+    lines.append("")
+    lines.append(f"    void append({', '.join(parameters)}) {{")
+    lines.append(f"        {index_data.attrib_type} index_offset = static_cast<{index_data.attrib_type}>(vertex_count());")
+    lines.append(f"        {index_data.plural_name}.reserve({index_data.plural_name}.size() + new_{index_data.plural_name}.size());")
+    lines.append(f"        for ({index_data.attrib_type} {index_data.singular_name} : new_{index_data.plural_name}) {{")
+    lines.append(f"            {index_data.plural_name}.push_back(index_offset + {index_data.singular_name});")
+    lines.append("        }")
+    for data in attribute_datas:
+        lines.append(f"        {data.plural_name}.insert({data.plural_name}.end(), new_{data.plural_name}.begin(), new_{data.plural_name}.end());")
+    lines.append("    }")
+
+    lines.append("")
+    lines.append(f"    void upload_{index_data.plural_name}(GLuint buffer, GLenum usage = GL_DYNAMIC_DRAW) const {{")
+    lines.append("        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, buffer);")
+    lines.append(f"        glBufferData(GL_ELEMENT_ARRAY_BUFFER, {index_data.plural_name}.size() * sizeof({index_data.attrib_type}), {index_data.plural_name}.data(), usage);")
+    lines.append("    }")
+    for data in attribute_datas:
+        lines.append("")
+        lines.append(f"    void upload_{data.plural_name}(GLuint buffer, GLenum usage = GL_DYNAMIC_DRAW) const {{")
+        lines.append("        glBindBuffer(GL_ARRAY_BUFFER, buffer);")
+        lines.append(f"        glBufferData(GL_ARRAY_BUFFER, {data.plural_name}.size() * sizeof({data.attrib_type}), {data.plural_name}.data(), usage);")
+        lines.append("    }")
+    lines.append("};")
+    return lines
+
+def generate_cpp(shader_info, catalog=None, output_directory: Optional[str] = None):
+    """
+    Generates shader_standard.hpp and shader_standard.cpp for the shader cache, files whose content
+    didn't change are left alone.
+    :param catalog: The catalog to emit, defaults to the whole shader_catalog.
+    :param output_directory: Where the files are written, defaults to the directory of this script.
+    :return: The paths of both files.
+    """
+    if catalog is None:
+        catalog = shader_catalog
+    if output_directory is None:
+        output_directory = default_output_directory
+
     hpp_output = []
 
     hpp_output.append("#ifndef SHADER_STANDARD_HPP")
@@ -151,7 +516,10 @@ def generate_cpp(shader_info):
     hpp_output.append("#include <unordered_map>")
     hpp_output.append("#include <string>")
     hpp_output.append("#include <vector>")
+    hpp_output.append("#include <cstddef>")
     hpp_output.append("#include <glad/glad.h>")
+    hpp_output.append("#include <glm/glm.hpp>")
+    hpp_output.append("#include <glm/gtc/type_ptr.hpp>")
 
     hpp_output.append("")
 
@@ -180,6 +548,37 @@ def generate_cpp(shader_info):
     hpp_output.append("};")
     hpp_output.append("")
 
+    # ShaderUniformBlock enum
+    hpp_output.append("enum class ShaderUniformBlock {")
+    for block in ShaderUniformBlock:
+        hpp_output.append(f"    {block.name},")
+    hpp_output.append("};")
+    hpp_output.append("")
+
+    # One struct per uniform block, laid out by the std140 rules so it can be uploaded as is
+    for block, block_data in shader_uniform_block_to_data.items():
+        hpp_output.extend(generate_uniform_block_struct(block, block_data))
+        hpp_output.append("")
+
+    # One struct per shader type that skips uploading uniforms which already hold the value
+    hpp_output.append("struct UniformUploadCounters {")
+    hpp_output.append("    unsigned long long issued = 0;")
+    hpp_output.append("    unsigned long long skipped = 0;")
+    hpp_output.append("};")
+    hpp_output.append("")
+    for shader_type, variables in shader_info.items():
+        uniforms = [ShaderUniformVariable[uniform] for uniform in dict.fromkeys(variables['valid_uniforms'])]
+        hpp_output.extend(generate_shader_uniforms_struct(shader_type, uniforms))
+        hpp_output.append("")
+
+    # One structure of arrays per shader type for batching its vertices
+    for shader_type, variables in shader_info.items():
+        attributes = [ShaderVertexAttributeVariable[attribute] for attribute in variables['valid_attributes']]
+        batch_struct = generate_shader_batch_struct(shader_type, attributes)
+        if batch_struct:
+            hpp_output.extend(batch_struct)
+            hpp_output.append("")
+
     # ShaderCreationInfo struct
     hpp_output.append("struct ShaderCreationInfo {")
     hpp_output.append("    std::string vertex_path;")
@@ -208,14 +607,23 @@ def generate_cpp(shader_info):
     hpp_output.append("class ShaderStandard {")
     hpp_output.append("public:")
     hpp_output.append("    std::unordered_map<ShaderVertexAttributeVariable, GLVertexAttributeConfiguration> shader_vertex_attribute_to_glva_configuration;")
+    # Every vertex attribute has one location for all shader types, bind it before linking so vaos can be shared
+    hpp_output.append("    std::unordered_map<ShaderVertexAttributeVariable, GLuint> shader_vertex_attribute_to_location;")
     hpp_output.append("    std::unordered_map<ShaderUniformVariable, std::string> shader_uniform_variable_to_name;")
     hpp_output.append("    std::unordered_map<ShaderVertexAttributeVariable, std::string> shader_vertex_attribute_variable_to_name;")
     hpp_output.append("    std::unordered_map<ShaderType, std::string> shader_type_to_name;")
     hpp_output.append("    std::unordered_map<ShaderType, ShaderCreationInfo> shader_catalog;")
+    # Every shader type that uses a source file, so only those have to be relinked when the file changes
+    hpp_output.append("    std::unordered_map<std::string, std::vector<ShaderType>> shader_source_path_to_shader_types;")
     
     # New variables for used vertex attributes and uniforms
     hpp_output.append("    std::unordered_map<ShaderType, std::vector<ShaderVertexAttributeVariable>> shader_to_used_vertex_attribute_variables;")
     hpp_output.append("    std::unordered_map<ShaderType, std::vector<ShaderUniformVariable>> shader_to_used_uniform_variable;")
+    # Every sampler has one texture unit for all shader types, set it once after linking and bind textures to it
+    hpp_output.append("    std::unordered_map<ShaderUniformVariable, GLint> shader_uniform_variable_to_texture_unit;")
+    hpp_output.append("    std::unordered_map<ShaderUniformBlock, std::string> shader_uniform_block_to_name;")
+    hpp_output.append("    std::unordered_map<ShaderUniformBlock, GLuint> shader_uniform_block_to_binding;")
+    hpp_output.append("    std::unordered_map<ShaderType, std::vector<ShaderUniformBlock>> shader_to_used_uniform_blocks;")
     hpp_output.append("")
 
     hpp_output.append("    ShaderStandard() {")
@@ -225,6 +633,11 @@ def generate_cpp(shader_info):
             hpp_output.append(f"            {{ShaderVertexAttributeVariable::{attribute.name}, GLVertexAttributeConfiguration{{{config.components_per_vertex}, {config.data_type_of_component}, {config.normalize}, {config.stride}, {config.pointer_to_start_of_data}}}}},")
     hpp_output.append("        };")
 
+    hpp_output.append("        shader_vertex_attribute_to_location = {")
+    for attribute, config in vertex_attribute_to_configuration.items():
+        hpp_output.append(f"            {{ShaderVertexAttributeVariable::{attribute.name}, {config.location}}},")
+    hpp_output.append("        };")
+
     hpp_output.append("        shader_uniform_variable_to_name = {")
     for uniform in ShaderUniformVariable:
         hpp_output.append(f"            {{ShaderUniformVariable::{uniform.name}, \"{uniform.name.lower()}\"}},")
@@ -243,10 +656,21 @@ def generate_cpp(shader_info):
  
 
     hpp_output.append("        shader_catalog = {")
-    for shader_type, prog in shader_catalog.items():
+    for shader_type, prog in catalog.items():
         hpp_output.append(f"            {{ShaderType::{shader_type.name}, {{\"assets/shaders/{prog.vertex_shader_filename}\", \"assets/shaders/{prog.fragment_shader_filename}\"}}}},")
     hpp_output.append("        };")
 
+    # Generate shader_source_path_to_shader_types, the paths are the same as in shader_catalog
+    source_path_to_shader_types = {}
+    for shader_type, prog in catalog.items():
+        for filename in dict.fromkeys([prog.vertex_shader_filename, prog.fragment_shader_filename]):
+            source_path_to_shader_types.setdefault(f"assets/shaders/{filename}", []).append(shader_type)
+    hpp_output.append("        shader_source_path_to_shader_types = {")
+    for source_path, shader_types in source_path_to_shader_types.items():
+        shader_types_list = ', '.join(f"ShaderType::{shader_type.name}" for shader_type in shader_types)
+        hpp_output.append(f"            {{\"{source_path}\", {{{shader_types_list}}}}},")
+    hpp_output.append("        };")
+
     # Generate shader_to_used_vertex_attribute_variables
     hpp_output.append("        shader_to_used_vertex_attribute_variables = {")
     for shader_type, variables in shader_info.items():
@@ -261,6 +685,30 @@ def generate_cpp(shader_info):
         hpp_output.append(f"            {{ShaderType::{shader_type.name}, {{{uniforms}}}}},")
     hpp_output.append("        };")
 
+    # Generate shader_uniform_variable_to_texture_unit
+    hpp_output.append("        shader_uniform_variable_to_texture_unit = {")
+    for uniform, data in shader_uniform_variable_to_data.items():
+        if data.texture_unit is not None:
+            hpp_output.append(f"            {{ShaderUniformVariable::{uniform.name}, {data.texture_unit}}},")
+    hpp_output.append("        };")
+
+    # Generate shader_uniform_block_to_name and shader_uniform_block_to_binding
+    hpp_output.append("        shader_uniform_block_to_name = {")
+    for block, block_data in shader_uniform_block_to_data.items():
+        hpp_output.append(f"            {{ShaderUniformBlock::{block.name}, \"{block_data.glsl_name}\"}},")
+    hpp_output.append("        };")
+    hpp_output.append("        shader_uniform_block_to_binding = {")
+    for block in shader_uniform_block_to_data:
+        hpp_output.append(f"            {{ShaderUniformBlock::{block.name}, {get_uniform_block_binding_constant_name(block)}}},")
+    hpp_output.append("        };")
+
+    # Generate shader_to_used_uniform_blocks
+    hpp_output.append("        shader_to_used_uniform_blocks = {")
+    for shader_type, variables in shader_info.items():
+        blocks = ', '.join(f"ShaderUniformBlock::{block}" for block in variables['valid_uniform_blocks'])
+        hpp_output.append(f"            {{ShaderType::{shader_type.name}, {{{blocks}}}}},")
+    hpp_output.append("        };")
+
     hpp_output.append("    }")
 
     # End class definition
@@ -268,13 +716,9 @@ def generate_cpp(shader_info):
 
     hpp_output.append("#endif // SHADER_STANDARD_HPP")
 
-    # Define the output directory (script directory)
-    output_directory = os.path.dirname(os.path.abspath(__file__))
-
     # Write to output header file
     header_file_path = os.path.join(output_directory, "shader_standard.hpp")
-    with open(header_file_path, "w") as hpp_file:
-        hpp_file.write("\n".join(hpp_output))
+    write_file_if_changed(header_file_path, "\n".join(hpp_output))
 
     cpp_output = []
     cpp_output.append('#include "shader_standard.hpp"')
@@ -294,40 +738,193 @@ def generate_cpp(shader_info):
     cpp_output.append("    }")
     cpp_output.append("}")
 
-    # Define the output directory (script directory)
-    output_directory = os.path.dirname(os.path.abspath(__file__))
-
-    # Write to output header file
+    # Write to output source file
     source_file_path = os.path.join(output_directory, "shader_standard.cpp")
-    with open(source_file_path, "w") as cpp_file:
-        cpp_file.write("\n".join(cpp_output))
+    write_file_if_changed(source_file_path, "\n".join(cpp_output))
+
+    return [header_file_path, source_file_path]
+
+def generate_py_shader_summary(shader_info, output_directory: Optional[str] = None):
+    """
+    Generates shader_summary.py, it is left alone if its content didn't change.
+    :return: The path of the file.
+    """
+    if output_directory is None:
+        output_directory = default_output_directory
 
-def generate_py_shader_summary(shader_info):
     py_output = []  # List to accumulate output lines
 
     # Generate shader_to_used_vertex_attribute_variables
-    py_output.append("from standard import *\n")
+    py_output.append("import numpy as np\n")
+    py_output.append("from standard import *\n\n")
     py_output.append("shader_to_used_vertex_attribute_variables = {\n")
     for shader_type, variables in shader_info.items():
         attributes = ', '.join(f"ShaderVertexAttributeVariable.{attr}" for attr in variables['valid_attributes'])
         py_output.append(f"    ShaderType.{shader_type.name}: [{attributes}],\n")
     py_output.append("}\n\n")
 
-    # # Generate shader_to_used_uniform_variable
-    # py_output.append("shader_to_used_uniform_variable = {\n")
-    # for shader_type, variables in shader_info.items():
-    #     uniforms = ', '.join(f"ShaderUniformVariable.{uniform}" for uniform in variables['valid_uniforms'])
-    #     py_output.append(f"    ShaderType.{shader_type.name}: {{{uniforms}}},\n")
-    # py_output.append("}\n")
+    # Generate shader_to_vertex_dtype, only attributes that are bound to opengl have a layout
+    py_output.append("# one field per vertex attribute in the order the vertex shader declares them, the standard binds\n")
+    py_output.append("# every attribute from its own tightly packed buffer so use vertices[name] to split them back out\n")
+    py_output.append("shader_to_vertex_dtype = {\n")
+    for shader_type, variables in shader_info.items():
+        dtype_fields = []
+        for attr in variables['valid_attributes']:
+            config = vertex_attribute_to_configuration.get(ShaderVertexAttributeVariable[attr])
+            if config is None:
+                continue
+            numpy_type = gl_data_type_to_numpy_type[config.data_type_of_component.strip()]
+            components = int(config.components_per_vertex)
+            shape = f", ({components},)" if components > 1 else ""
+            dtype_fields.append(f"(\"{attr.lower()}\", np.{numpy_type}{shape})")
+        py_output.append(f"    ShaderType.{shader_type.name}: np.dtype([{', '.join(dtype_fields)}]),\n")
+    py_output.append("}\n\n")
 
-    # Define the output directory (script directory)
-    output_directory = os.path.dirname(os.path.abspath(__file__))
+    # Generate shader_to_used_uniform_variables, maps each uniform to its glsl type
+    py_output.append("shader_to_used_uniform_variables = {\n")
+    for shader_type, variables in shader_info.items():
+        uniforms = ', '.join(
+            f"ShaderUniformVariable.{uniform}: \"{shader_uniform_variable_to_data[ShaderUniformVariable[uniform]].glsl_type}\""
+            for uniform in dict.fromkeys(variables['valid_uniforms'])
+        )
+        py_output.append(f"    ShaderType.{shader_type.name}: {{{uniforms}}},\n")
+    py_output.append("}\n")
 
     # Write all accumulated lines to the file
     summary_file_path = os.path.join(output_directory, "shader_summary.py")
-    with open(summary_file_path, 'w') as f:
-        f.writelines(py_output)
+    write_file_if_changed(summary_file_path, "".join(py_output))
+
+    return [summary_file_path]
+
+
+@dataclass
+class BatchProject:
+    name: str
+    shader_directory: str
+    output_directory: str
+    catalog: dict
+
+def load_batch_manifest(manifest_path: str):
+    """
+    Reads a manifest describing several projects, relative paths are relative to the manifest, eg)
+
+    {
+        "projects": [
+            {
+                "name": "observatory",
+                "shader_directory": "observatory/assets/shaders",
+                "output_directory": "observatory/src/graphics/shader_standard",
+                "catalog": ["CWL_V_TRANSFORMATION_WITH_SOLID_COLOR", "TEXT"]
+            }
+        ]
+    }
+
+    catalog is optional, without it the project uses the whole shader_catalog. Every project needs its
+    own output directory since they all generate files with the same names.
+    """
+    with open(manifest_path, 'r') as manifest_file:
+        manifest = json.load(manifest_file)
 
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("projects"), list):
+        raise ValueError(f"'{manifest_path}' should be an object with a list of projects under 'projects'.")
+
+    manifest_directory = os.path.dirname(os.path.abspath(manifest_path))
+    projects = []
+    output_directory_to_name = {}
+    for index, project in enumerate(manifest["projects"]):
+        if not isinstance(project, dict):
+            raise ValueError(f"Project {index} in '{manifest_path}' should be an object.")
+        name = project.get("name", f"project_{index}")
+        for required_key in ("shader_directory", "output_directory"):
+            if required_key not in project:
+                raise ValueError(f"Project '{name}' in '{manifest_path}' is missing '{required_key}'.")
+            if not isinstance(project[required_key], str):
+                raise ValueError(f"Project '{name}' in '{manifest_path}' whose '{required_key}' isn't a path.")
+
+        # two projects writing the same generated files would silently overwrite each other
+        output_directory = os.path.join(manifest_directory, project["output_directory"])
+        real_output_directory = os.path.realpath(output_directory)
+        if real_output_directory in output_directory_to_name:
+            raise ValueError(f"Projects '{output_directory_to_name[real_output_directory]}' and '{name}' in '{manifest_path}' both use the output directory '{output_directory}'.")
+        output_directory_to_name[real_output_directory] = name
+
+        catalog = shader_catalog
+        if "catalog" in project:
+            if not isinstance(project["catalog"], list) or not all(isinstance(shader_type, str) for shader_type in project["catalog"]):
+                raise ValueError(f"Project '{name}' in '{manifest_path}' has a catalog that isn't a list of shader type names.")
+            unknown_shader_types = [shader_type for shader_type in project["catalog"] if shader_type not in ShaderType.__members__]
+            if unknown_shader_types:
+                raise ValueError(f"Project '{name}' in '{manifest_path}' uses the unknown shader types {unknown_shader_types}.")
+            catalog = {ShaderType[shader_type]: shader_catalog[ShaderType[shader_type]] for shader_type in project["catalog"]}
+
+        projects.append(BatchProject(
+            name,
+            os.path.join(manifest_directory, project["shader_directory"]),
+            output_directory,
+            catalog,
+        ))
+    return projects
+
+def run_batch(projects, verbose: bool, output_info: bool, gen_cpp: bool, gen_py_shader_summary: bool, cost_sort_key: Optional[str] = None):
+    """
+    Validates every project in one process, source files that are shared between projects are only
+    read and validated once.
+    :param cost_sort_key: When given each report includes the cost report of the project sorted by it.
+    :return: A report for each project along with the cache that was shared between them.
+    """
+    shader_source_cache = ShaderSourceCache()
+    project_reports = []
+
+    for project in projects:
+        colored_print(f"Project {project.name}:", TextColor.BRIGHT_BLUE)
+        shader_info = validate_all_shaders(project.catalog, project.shader_directory, verbose, output_info, shader_source_cache)
+
+        os.makedirs(project.output_directory, exist_ok=True)
+        generated_files = []
+        if gen_cpp:
+            generated_files += generate_cpp(shader_info, project.catalog, project.output_directory)
+        if gen_py_shader_summary:
+            generated_files += generate_py_shader_summary(shader_info, project.output_directory)
+
+        shader_costs = estimate_shader_costs(shader_info)
+        project_reports.append({
+            "name": project.name,
+            "shader_directory": project.shader_directory,
+            "output_directory": project.output_directory,
+            "generated_files": generated_files,
+            "shader_types_validated": len(shader_info),
+            "shader_types_missing_files": [shader_type.name for shader_type in project.catalog if shader_type not in shader_info],
+            "errors": sum(len(info["errors"]) for info in shader_info.values()),
+            "budget_violations": check_cost_budgets(shader_costs),
+        })
+        if cost_sort_key is not None:
+            project_reports[-1]["cost_report"] = create_cost_report(shader_costs, cost_sort_key)
+
+    return project_reports, shader_source_cache
+
+def create_combined_cost_report(project_reports, sort_key: str):
+    """
+    Puts the cost reports of every project into one, with a column saying which project each row is from.
+    """
+    rows = [{"project": report["name"], **row} for report in project_reports for row in report["cost_report"]]
+    rows.sort(key=lambda row: row[sort_key], reverse=True)
+    return rows
+
+def print_batch_report(project_reports, shader_source_cache: ShaderSourceCache):
+    colored_print("Batch Report:", TextColor.BRIGHT_BLUE)
+    for report in project_reports:
+        is_clean = not (report["errors"] or report["shader_types_missing_files"] or report["budget_violations"])
+        colored_print(
+            f"  {report['name']}: {report['shader_types_validated']} shader types validated, "
+            f"{len(report['shader_types_missing_files'])} missing files, {report['errors']} errors, "
+            f"{len(report['budget_violations'])} budget violations",
+            TextColor.GREEN if is_clean else TextColor.RED,
+        )
+    colored_print(
+        f"  read {shader_source_cache.files_read} files, validated {shader_source_cache.sources_validated} unique sources "
+        f"and reused {shader_source_cache.validations_reused} validations",
+        TextColor.GRAY,
+    )
 
 
 if __name__ == "__main__":
@@ -343,8 +940,7 @@ if __name__ == "__main__":
         "--shader-directory", 
         "-sd",
         type=str, 
-        default="../../assets/shaders/",
-        help="Path to the directory containing shader files"
+        help=f"Path to the directory containing shader files, defaults to {default_shader_directory}"
     )
     parser.add_argument(
         "--summary", 
@@ -359,15 +955,119 @@ if __name__ == "__main__":
         help="Generates the required cpp file to integrate with the shader cache"
     )
     parser.add_argument('--gen-py-shader-summary', '-gp', action="store_true", help="Generate Python shader summary file")
+    parser.add_argument(
+        "--cost-report",
+        "-cr",
+        action="store_true",
+        help="Output the estimated cost of each shader stage"
+    )
+    parser.add_argument(
+        "--cost-sort-key",
+        "-csk",
+        type=str,
+        choices=cost_metrics,
+        default="alu_operations",
+        help="The metric the cost report is sorted by, most expensive first"
+    )
+    parser.add_argument(
+        "--cost-export",
+        "-ce",
+        type=str,
+        help="Write the cost report to this .csv or .json file"
+    )
+    parser.add_argument(
+        "--output-directory",
+        "-od",
+        type=str,
+        help="Path to the directory the generated files are written to, defaults to the directory of this script"
+    )
+    parser.add_argument(
+        "--batch-manifest",
+        "-bm",
+        type=str,
+        help="Validate every project listed in this json manifest instead of a single shader directory"
+    )
+    parser.add_argument(
+        "--batch-report",
+        "-br",
+        type=str,
+        help="Write the combined report of a batch run to this json file"
+    )
+    parser.add_argument(
+        "--depfile",
+        "-df",
+        type=str,
+        help="Write a make/ninja depfile listing every file the generated files were made from"
+    )
 
     args = parser.parse_args()
 
+    if args.depfile and not (args.gen_cpp or args.gen_py_shader_summary):
+        colored_print("Error: --depfile needs something to be generated, use --gen-cpp or --gen-py-shader-summary.", TextColor.RED)
+        sys.exit(1)
+
+    if args.batch_manifest:
+        # every project in the manifest has its own directories
+        for flag, value in (("--shader-directory", args.shader_directory), ("--output-directory", args.output_directory)):
+            if value is not None:
+                colored_print(f"Error: {flag} can't be used with --batch-manifest, set it for each project in the manifest.", TextColor.RED)
+                sys.exit(1)
+
+        try:
+            projects = load_batch_manifest(args.batch_manifest)
+        except (OSError, KeyError, ValueError) as error:
+            colored_print(f"Error: could not load the batch manifest, {error}", TextColor.RED)
+            sys.exit(1)
+
+        cost_sort_key = args.cost_sort_key if args.cost_report or args.cost_export else None
+        project_reports, shader_source_cache = run_batch(projects, args.verbose, args.summary, args.gen_cpp, args.gen_py_shader_summary, cost_sort_key)
+        if args.cost_report:
+            for report in project_reports:
+                colored_print(f"Project {report['name']}:", TextColor.BRIGHT_BLUE)
+                print_cost_report(report["cost_report"])
+        if args.cost_export:
+            combined_cost_report = create_combined_cost_report(project_reports, cost_sort_key)
+            export_cost_report(combined_cost_report, args.cost_export)
+        print_batch_report(project_reports, shader_source_cache)
+        if args.depfile:
+            write_depfile(args.depfile, [path for report in project_reports for path in report["generated_files"]], shader_source_cache, [args.batch_manifest])
+        if args.batch_report:
+            with open(args.batch_report, 'w') as report_file:
+                json.dump(project_reports, report_file, indent=4)
+        if any(report["budget_violations"] for report in project_reports):
+            sys.exit(1)
+        sys.exit(0)
+
+    if args.shader_directory is None:
+        args.shader_directory = default_shader_directory
+    if args.output_directory is None:
+        args.output_directory = default_output_directory
+
     # Validate all shaders
-    shader_info = validate_all_shaders(shader_catalog, args.shader_directory, args.verbose, args.summary)
+    shader_source_cache = ShaderSourceCache()
+    shader_info = validate_all_shaders(shader_catalog, args.shader_directory, args.verbose, args.summary, shader_source_cache)
+    if args.gen_cpp or args.gen_py_shader_summary:
+        os.makedirs(args.output_directory, exist_ok=True)
+
+    generated_files = []
     if args.gen_cpp:
-        generate_cpp(shader_info)
+        generated_files += generate_cpp(shader_info, shader_catalog, args.output_directory)
 
     if args.gen_py_shader_summary:
-        generate_py_shader_summary(shader_info)
+        generated_files += generate_py_shader_summary(shader_info, args.output_directory)
+
+    if args.depfile:
+        write_depfile(args.depfile, generated_files, shader_source_cache)
+
+    shader_costs = estimate_shader_costs(shader_info)
+    if args.cost_report or args.cost_export:
+        cost_report = create_cost_report(shader_costs, args.cost_sort_key)
+        if args.cost_report:
+            print_cost_report(cost_report)
+        if args.cost_export:
+            export_cost_report(cost_report, args.cost_export)
+
+    if check_cost_budgets(shader_costs):
+        sys.exit(1)
 
 
@@ -0,0 +1,427 @@
+from standard import *
+from colored_print import *
+from gl_types import glsl_type_to_info
+from dataclasses import dataclass, asdict, fields
+from typing import Dict, List, Optional
+import json
+import csv
+import re
+
+"""
+A static cost model for the shaders in the catalog, nothing here needs a gpu, we only look
+at the source code that was loaded while validating the shaders (see validate_all_shaders)
+
+The numbers are estimates which are meant to be compared against each other and against the
+budgets registered in the standard, they are not cycle counts for any specific hardware
+"""
+
+# rough cost of builtin functions in scalar alu operations, anything not listed costs 1
+builtin_function_to_alu_cost = {
+    "normalize": 3,
+    "length": 2,
+    "distance": 3,
+    "dot": 1,
+    "cross": 2,
+    "reflect": 3,
+    "refract": 6,
+    "mix": 2,
+    "clamp": 2,
+    "smoothstep": 4,
+    "step": 1,
+    "pow": 4,
+    "exp": 2,
+    "log": 2,
+    "sqrt": 2,
+    "inversesqrt": 1,
+    "sin": 2,
+    "cos": 2,
+    "tan": 4,
+    "max": 1,
+    "min": 1,
+    "abs": 1,
+    "floor": 1,
+    "fract": 1,
+    "inverse": 40,
+    "transpose": 4,
+}
+
+texture_functions = [
+    "texture", "textureLod", "textureOffset", "textureLodOffset", "textureGrad", "textureProj",
+    "textureGather", "texelFetch", "texelFetchOffset",
+]
+
+texture_call_pattern = re.compile(r"\b(?:" + "|".join(texture_functions) + r")\s*\(")
+builtin_call_pattern = re.compile(r"\b(" + "|".join(builtin_function_to_alu_cost.keys()) + r")\s*\(")
+operator_pattern = re.compile(r"\+\+|--|[+\-*/]=?")
+for_loop_pattern = re.compile(r"\bfor\s*\(([^;]*);([^;]*);([^)]*)\)")
+while_loop_pattern = re.compile(r"\bwhile\s*\(")
+constant_pattern = re.compile(r"#define\s+(\w+)\s+(\d+)|const\s+(?:int|uint)\s+(\w+)\s*=\s*(\d+)u?\s*;")
+struct_pattern = re.compile(r"struct\s+(\w+)\s*\{([^}]*)\}")
+declaration_pattern = re.compile(r"(\w+)\s+(\w+)\s*(?:\[\s*(\w+)\s*\])?\s*;")
+uniform_pattern = re.compile(r"\buniform\s+(\w+)\s+(\w+)\s*(?:\[\s*(\w+)\s*\])?\s*;")
+interpolation_qualifiers = r"(?:(?:flat|smooth|noperspective|centroid)\s+)*"
+function_pattern = re.compile(r"\b(\w+)\s+(\w+)\s*\(([^()]*)\)\s*\{")
+variable_pattern = re.compile(r"\b(" + "|".join(name for name, info in glsl_type_to_info.items() if not info.is_opaque) + r")\s+(\w+)")
+# the operand right before and right after an operator, with an optional index and member or swizzle
+left_operand_pattern = re.compile(r"(\w+)\s*(?:\[[^\]]*\])?\s*(?:\.\s*(\w+))?\s*$")
+right_operand_pattern = re.compile(r"\s*(\w+)\s*(\()?\s*(?:\[[^\]]*\])?\s*(?:\.\s*(\w+))?")
+swizzle_pattern = re.compile(r"[xyzw]{1,4}|[rgba]{1,4}|[stpq]{1,4}")
+control_keywords = ["if", "for", "while", "switch", "return"]
+
+
+@dataclass
+class ShaderStageCost:
+    texture_samples: int = 0
+    loop_iterations: int = 0
+    unbounded_loops: int = 0
+    alu_operations: int = 0
+    interpolators: int = 0
+    interpolator_components: int = 0
+    uniform_components: int = 0
+
+
+cost_metrics = [field.name for field in fields(ShaderStageCost)]
+
+# which limit of a ShaderCostBudget applies to which metric of a ShaderStageCost
+cost_metric_to_budget_attribute = {
+    "texture_samples": "max_texture_samples",
+    "loop_iterations": "max_loop_iterations",
+    "alu_operations": "max_alu_operations",
+    "interpolators": "max_interpolators",
+    "interpolator_components": "max_interpolator_components",
+    "uniform_components": "max_uniform_components",
+}
+
+
+def strip_comments(shader_code: str) -> str:
+    return re.sub(r"//[^\n]*|/\*.*?\*/", "", shader_code, flags=re.S)
+
+
+def resolve_integer(token: str, constants: Dict[str, int]) -> Optional[int]:
+    token = token.strip().rstrip("u")
+    if token.isdigit():
+        return int(token)
+    return constants.get(token)
+
+
+def find_end_of_parentheses(code: str, start: int) -> int:
+    """
+    Given the position of an opening parenthesis returns the position right after its match
+    """
+    depth = 0
+    for i in range(start, len(code)):
+        if code[i] == "(":
+            depth += 1
+        elif code[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(code)
+
+
+def find_end_of_statement(code: str, start: int) -> int:
+    """
+    Given the position right after a loop header returns the position right after the body,
+    the body being either a braced block or a single statement, which may itself be an unbraced
+    loop or if so that is followed through to its own body
+    """
+    position = start
+    while position < len(code) and code[position].isspace():
+        position += 1
+
+    if position < len(code) and code[position] == "{":
+        depth = 0
+        for i in range(position, len(code)):
+            if code[i] == "{":
+                depth += 1
+            elif code[i] == "}":
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+        return len(code)
+
+    control_match = re.match(r"(for|while|if)\s*\(", code[position:])
+    if control_match:
+        header_end = find_end_of_parentheses(code, position + control_match.end() - 1)
+        end = find_end_of_statement(code, header_end)
+        if control_match.group(1) == "if":
+            else_match = re.match(r"\s*else\b", code[end:])
+            if else_match:
+                end = find_end_of_statement(code, end + else_match.end())
+        return end
+
+    do_match = re.match(r"do\b", code[position:])
+    if do_match:
+        body_end = find_end_of_statement(code, position + do_match.end())
+        # the body is followed by while (...);
+        return find_end_of_statement(code, body_end)
+
+    end = code.find(";", position)
+    return len(code) if end == -1 else end + 1
+
+
+def get_loop_iteration_count(header, constants: Dict[str, int]) -> Optional[int]:
+    """
+    Works out the trip count of loops shaped like for (int i = a; i < b; i++), returns None when
+    the bounds can't be determined statically
+    """
+    initialization, condition, _ = header
+    start_match = re.search(r"=\s*(\w+)\s*$", initialization.strip())
+    condition_match = re.fullmatch(r"\s*(\w+)\s*(<=|<)\s*(\w+)\s*", condition)
+    if not start_match or not condition_match:
+        return None
+
+    start = resolve_integer(start_match.group(1), constants)
+    bound = resolve_integer(condition_match.group(3), constants)
+    if start is None or bound is None:
+        return None
+
+    iterations = bound - start + (1 if condition_match.group(2) == "<=" else 0)
+    return max(iterations, 0)
+
+
+def get_operand_type(name: Optional[str], member: Optional[str], variable_to_type: Dict[str, str], is_constructor: bool = False) -> Optional[str]:
+    """
+    Works out the glsl type of an operand from the variable declarations, a swizzle or a
+    constructor, returns None when it can't be told statically (eg. the result of a call)
+    """
+    if member is not None:
+        if swizzle_pattern.fullmatch(member):
+            return "float" if len(member) == 1 else f"vec{len(member)}"
+        return None
+    if is_constructor:
+        return name if name in glsl_type_to_info else None
+    return variable_to_type.get(name)
+
+
+def get_operator_alu_cost(left_type: Optional[str], right_type: Optional[str]) -> int:
+    """
+    The number of scalar operations an arithmetic operator costs given the types of its operands,
+    a matrix times a vector is a dot product per row, a matrix times a matrix one per column
+    """
+    operand_types = [glsl_type for glsl_type in (left_type, right_type) if glsl_type is not None]
+    if not operand_types:
+        return 1
+
+    matrix_sizes = [int(glsl_type[-1]) for glsl_type in operand_types if glsl_type.startswith("mat")]
+    if len(matrix_sizes) == 2:
+        return matrix_sizes[0] ** 3
+    if matrix_sizes and any(glsl_type_to_info[glsl_type].component_count > 1 for glsl_type in operand_types if not glsl_type.startswith("mat")):
+        return matrix_sizes[0] ** 2
+    return max(glsl_type_to_info[glsl_type].component_count for glsl_type in operand_types)
+
+
+def get_declaration_component_count(glsl_type: str, array_size: Optional[str], constants: Dict[str, int], struct_to_component_count: Dict[str, int]) -> int:
+    if glsl_type in glsl_type_to_info:
+        type_info = glsl_type_to_info[glsl_type]
+        # samplers refer to texture units, they don't take up uniform storage
+        component_count = 0 if type_info.is_opaque else type_info.component_count
+    else:
+        component_count = struct_to_component_count.get(glsl_type, 0)
+
+    if array_size:
+        count = resolve_integer(array_size, constants)
+        component_count *= count if count is not None else 1
+
+    return component_count
+
+
+def estimate_stage_cost(shader_code: str, is_vertex_stage: bool) -> ShaderStageCost:
+    """
+    Estimates the cost of a single shader stage, anything inside of a loop with a known trip
+    count is counted once per iteration and a call to a function defined in the shader costs
+    whatever its body costs, so helpers called from a loop are counted once per iteration too
+    """
+    cost = ShaderStageCost()
+    code = strip_comments(shader_code)
+
+    constants = {}
+    for define_name, define_value, const_name, const_value in constant_pattern.findall(code):
+        if define_name:
+            constants[define_name] = int(define_value)
+        else:
+            constants[const_name] = int(const_value)
+
+    struct_to_component_count = {}
+    for struct_name, struct_body in struct_pattern.findall(code):
+        struct_to_component_count[struct_name] = sum(
+            get_declaration_component_count(member_type, array_size, constants, struct_to_component_count)
+            for member_type, _, array_size in declaration_pattern.findall(struct_body)
+        )
+
+    # the body of every function other than main is only counted where it's called from
+    function_to_bodies = {}
+    for function_match in function_pattern.finditer(code):
+        if function_match.group(1) in control_keywords or function_match.group(2) in control_keywords:
+            continue
+        body_start = function_match.end() - 1
+        function_to_bodies.setdefault(function_match.group(2), []).append((body_start, find_end_of_statement(code, body_start)))
+    function_to_bodies.pop("main", None)
+
+    # every character of the source gets a weight which is how many times it executes
+    weights = [1] * len(code)
+    # (position, metric, amount) for everything that costs something, amounts are already weighted
+    cost_events = []
+    for loop_match in for_loop_pattern.finditer(code):
+        body_end = find_end_of_statement(code, loop_match.end())
+        iterations = get_loop_iteration_count(loop_match.groups(), constants)
+        if iterations is None:
+            cost_events.append((loop_match.start(), "unbounded_loops", 1))
+            continue
+        cost_events.append((loop_match.start(), "loop_iterations", iterations * weights[loop_match.start()]))
+        for i in range(loop_match.end(), body_end):
+            weights[i] *= iterations
+
+    for match in while_loop_pattern.finditer(code):
+        cost_events.append((match.start(), "unbounded_loops", 1))
+
+    for match in texture_call_pattern.finditer(code):
+        cost_events.append((match.start(), "texture_samples", weights[match.start()]))
+
+    variable_to_type = {name: glsl_type for glsl_type, name in variable_pattern.findall(code)}
+    executable_code = re.sub(r"#[^\n]*", lambda m: " " * len(m.group(0)), code)
+    for match in builtin_call_pattern.finditer(executable_code):
+        cost_events.append((match.start(), "alu_operations", builtin_function_to_alu_cost[match.group(1)] * weights[match.start()]))
+    for match in operator_pattern.finditer(executable_code):
+        left_match = left_operand_pattern.search(executable_code, max(match.start() - 64, 0), match.start())
+        right_match = right_operand_pattern.match(executable_code, match.end())
+        left_type = get_operand_type(left_match.group(1), left_match.group(2), variable_to_type) if left_match else None
+        right_type = None
+        if right_match and match.group(0) not in ("++", "--"):
+            right_type = get_operand_type(right_match.group(1), right_match.group(3), variable_to_type, right_match.group(2) is not None)
+        cost_events.append((match.start(), "alu_operations", get_operator_alu_cost(left_type, right_type) * weights[match.start()]))
+
+    call_sites = []
+    if function_to_bodies:
+        call_pattern = re.compile(r"\b(" + "|".join(function_to_bodies) + r")\s*\(")
+        # a name right after a type is a definition or a prototype rather than a call
+        call_sites = [
+            match for match in call_pattern.finditer(code)
+            if not re.search(r"\b(?!(?:return|else)\b)\w+\s*$", code[max(match.start() - 64, 0):match.start()])
+        ]
+
+    weighted_metrics = ["texture_samples", "loop_iterations", "alu_operations"]
+    function_to_cost = {}
+
+    def get_range_cost(start: int, end: int, calling_functions: List[str]) -> ShaderStageCost:
+        range_cost = ShaderStageCost()
+        for position, metric, amount in cost_events:
+            if start <= position < end:
+                setattr(range_cost, metric, getattr(range_cost, metric) + amount)
+        for call_match in call_sites:
+            if not start <= call_match.start() < end:
+                continue
+            callee_cost = get_function_cost(call_match.group(1), calling_functions)
+            # the callee's own loops are already weighted, only the call site multiplies it
+            for metric in weighted_metrics:
+                setattr(range_cost, metric, getattr(range_cost, metric) + getattr(callee_cost, metric) * weights[call_match.start()])
+            range_cost.unbounded_loops += callee_cost.unbounded_loops
+        return range_cost
+
+    def get_function_cost(function_name: str, calling_functions: List[str]) -> ShaderStageCost:
+        # glsl doesn't allow recursion, if a shader has it anyway the inner call is free
+        if function_name in calling_functions:
+            return ShaderStageCost()
+        if function_name not in function_to_cost:
+            # overloads share a name, without resolving the arguments assume the most expensive one
+            function_to_cost[function_name] = max(
+                (get_range_cost(body_start, body_end, calling_functions + [function_name]) for body_start, body_end in function_to_bodies[function_name]),
+                key=lambda function_cost: function_cost.alu_operations,
+            )
+        return function_to_cost[function_name]
+
+    # everything outside of the other functions runs once, which is main and any global initializers
+    boundaries = [0] + [position for bodies in function_to_bodies.values() for body in bodies for position in body] + [len(code)]
+    boundaries = sorted(boundaries)
+    for range_start, range_end in zip(boundaries[::2], boundaries[1::2]):
+        range_cost = get_range_cost(range_start, range_end, [])
+        for metric in weighted_metrics + ["unbounded_loops"]:
+            setattr(cost, metric, getattr(cost, metric) + getattr(range_cost, metric))
+
+    # interpolators are the outputs of the vertex shader and the inputs of the fragment shader
+    interpolator_keyword = "out" if is_vertex_stage else "in"
+    interpolator_pattern = rf"(?:^|;|\n)\s*{interpolation_qualifiers}{interpolator_keyword}\s+(\w+)\s+(\w+)\s*(?:\[\s*(\w+)\s*\])?\s*;"
+    for glsl_type, _, array_size in re.findall(interpolator_pattern, code):
+        cost.interpolators += 1
+        cost.interpolator_components += get_declaration_component_count(glsl_type, array_size, constants, struct_to_component_count)
+
+    for glsl_type, _, array_size in uniform_pattern.findall(code):
+        cost.uniform_components += get_declaration_component_count(glsl_type, array_size, constants, struct_to_component_count)
+
+    return cost
+
+
+def estimate_shader_costs(shader_info) -> Dict[ShaderType, Dict[str, ShaderStageCost]]:
+    """
+    Estimates the cost of each stage of every shader program that was loaded during validation.
+    :param shader_info: The result of validate_all_shaders.
+    :return: A mapping from ShaderType to a mapping from stage name to its cost.
+    """
+    shader_costs = {}
+    for shader_type, info in shader_info.items():
+        shader_costs[shader_type] = {
+            "vertex": estimate_stage_cost(info["vertex_shader_code"], True),
+            "fragment": estimate_stage_cost(info["fragment_shader_code"], False),
+        }
+    return shader_costs
+
+
+def create_cost_report(shader_costs, sort_key: str = "alu_operations", descending: bool = True) -> List[dict]:
+    """
+    Flattens the shader costs into one row per shader stage, sorted by the given metric.
+    """
+    if sort_key not in cost_metrics:
+        raise ValueError(f"Cannot sort the cost report by '{sort_key}', valid metrics are {cost_metrics}.")
+
+    rows = []
+    for shader_type, stage_to_cost in shader_costs.items():
+        for stage, cost in stage_to_cost.items():
+            rows.append({"shader_type": shader_type.name, "stage": stage, **asdict(cost)})
+
+    rows.sort(key=lambda row: row[sort_key], reverse=descending)
+    return rows
+
+
+def print_cost_report(rows: List[dict]):
+    colored_print("Shader Cost Report:", TextColor.BRIGHT_BLUE)
+    header = ["shader_type", "stage"] + cost_metrics
+    widths = {column: max([len(column)] + [len(str(row[column])) for row in rows]) for column in header}
+    colored_print("  ".join(column.ljust(widths[column]) for column in header), TextColor.MAGENTA)
+    for row in rows:
+        colored_print("  ".join(str(row[column]).ljust(widths[column]) for column in header), TextColor.GRAY)
+
+
+def export_cost_report(rows: List[dict], output_path: str):
+    """
+    Writes the report as csv or json depending on the extension of the output path.
+    """
+    if output_path.endswith(".json"):
+        with open(output_path, "w") as report_file:
+            json.dump(rows, report_file, indent=4)
+    elif output_path.endswith(".csv"):
+        with open(output_path, "w", newline="") as report_file:
+            # reports can carry extra columns in front, eg) the project in a batch run
+            fieldnames = list(rows[0]) if rows else ["shader_type", "stage"] + cost_metrics
+            writer = csv.DictWriter(report_file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        raise ValueError(f"Cannot export the cost report to '{output_path}', use a .csv or .json file.")
+
+
+def check_cost_budgets(shader_costs) -> List[str]:
+    """
+    Compares every stage against the budget of its shader type, logging and returning each violation.
+    """
+    violations = []
+    for shader_type, stage_to_cost in shader_costs.items():
+        budget = shader_type_to_cost_budget.get(shader_type, default_shader_cost_budget)
+        for stage, cost in stage_to_cost.items():
+            for metric, budget_attribute in cost_metric_to_budget_attribute.items():
+                limit = getattr(budget, budget_attribute)
+                value = getattr(cost, metric)
+                if limit is not None and value > limit:
+                    violation = f"{shader_type.name} {stage} shader has {value} {metric} which exceeds its budget of {limit}."
+                    colored_print(f"Error: {violation}", TextColor.RED)
+                    violations.append(violation)
+    return violations
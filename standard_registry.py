@@ -0,0 +1,643 @@
+from dataclasses import fields, MISSING
+from typing import Callable, Dict, List, Optional, Tuple
+from collections.abc import Mapping
+from gl_types import glsl_type_to_info
+import pickle
+import zlib
+import sys
+import os
+
+"""
+Compiles the declarative definition of the standard (standard.toml, or a .json file with the same
+layout) into a registry, the registry is checked for duplicate and conflicting entries and then
+stored as a snapshot in __pycache__ next to the definition. As long as the definition doesn't change
+later loads only read back the parts of the snapshot that something actually uses.
+
+The registry only holds plain python data, standard.py turns it into the enums and tables that the
+rest of the tooling uses. Those are the lazy types at the bottom of this module, so importing the
+standard costs the same no matter how big it is.
+"""
+
+# bump this whenever the layout of the registry changes so that old snapshots get recompiled, changes
+# to the rules a definition is checked against are picked up on their own, see get_code_signature
+REGISTRY_FORMAT_VERSION = 3
+
+# how many enum members are looked up together, see split_registry_into_parts
+ENUM_BUCKET_SIZE = 256
+
+# the modules whose code decides whether a definition is valid
+rule_module_names = ["standard_registry", "gl_types"]
+
+# the number of texture units opengl 3.3 guarantees for each shader stage
+MAX_TEXTURE_UNITS = 16
+# the number of vertex attribute locations opengl 3.3 guarantees
+MAX_VERTEX_ATTRIBUTE_LOCATIONS = 16
+
+glsl_scalar_prefix_to_gl_data_types = {
+    "": ["GL_FLOAT", "GL_HALF_FLOAT", "GL_DOUBLE"],
+    "i": ["GL_INT", "GL_SHORT", "GL_BYTE"],
+    "u": ["GL_UNSIGNED_INT", "GL_UNSIGNED_SHORT", "GL_UNSIGNED_BYTE"],
+}
+
+
+class StandardDefinitionError(Exception):
+    pass
+
+
+def get_schema_signature(table_to_schema, record_to_type) -> Tuple:
+    """
+    Describes the shape the registry is compiled into, a snapshot made for another shape is stale.
+    """
+    return (
+        tuple((table, key_enum, tuple(field.name for field in fields(value_type))) for table, (key_enum, value_type) in table_to_schema.items()),
+        tuple((record, tuple(field.name for field in fields(value_type))) for record, value_type in record_to_type.items()),
+    )
+
+
+def read_definition(definition_path: str) -> dict:
+    # the parsers are only imported here, loading a snapshot never needs them
+    if definition_path.endswith(".json"):
+        import json
+
+        duplicate_keys = []
+
+        def reject_duplicates(pairs):
+            seen = {}
+            for key, value in pairs:
+                if key in seen:
+                    duplicate_keys.append(key)
+                seen[key] = value
+            return seen
+
+        with open(definition_path, "r") as definition_file:
+            definition = json.load(definition_file, object_pairs_hook=reject_duplicates)
+        if duplicate_keys:
+            raise StandardDefinitionError(f"{definition_path}: the keys {duplicate_keys} are defined more than once.")
+        return definition
+
+    import tomllib
+    with open(definition_path, "rb") as definition_file:
+        try:
+            return tomllib.load(definition_file)
+        except tomllib.TOMLDecodeError as error:
+            # this is also how duplicate keys show up, "Cannot overwrite a value"
+            raise StandardDefinitionError(f"{definition_path}: {error}") from error
+
+
+def find_conflicts(tables: Dict[str, dict]) -> List[str]:
+    """
+    Checks that entries which talk about the same variable in different tables agree with each other.
+    """
+    problems = []
+    attribute_to_data = tables["shader_vertex_attribute_to_data"]
+    for attribute, configuration in tables["vertex_attribute_to_configuration"].items():
+        data = attribute_to_data.get(attribute)
+        if data is None:
+            problems.append(f"vertex_attribute_to_configuration.{attribute} has no entry in shader_vertex_attribute_to_data.")
+            continue
+        if data.get("glsl_type") not in glsl_type_to_info:
+            problems.append(f"shader_vertex_attribute_to_data.{attribute} has the unknown glsl type '{data.get('glsl_type')}'.")
+            continue
+        if "components_per_vertex" not in configuration or "data_type_of_component" not in configuration:
+            continue
+
+        component_count = glsl_type_to_info[data["glsl_type"]].component_count
+        # int, ivec, uint, uvec, everything else is made of floats
+        prefix = data["glsl_type"][0] if data["glsl_type"][0] in "iu" else ""
+        if str(component_count) != configuration["components_per_vertex"].strip():
+            problems.append(f"{attribute} is a {data['glsl_type']} but its configuration has {configuration['components_per_vertex']} components per vertex.")
+        if configuration["data_type_of_component"].strip() not in glsl_scalar_prefix_to_gl_data_types.get(prefix, []):
+            problems.append(f"{attribute} is a {data['glsl_type']} but its configuration uses {configuration['data_type_of_component']} components.")
+
+    location_to_attribute = {}
+    for attribute, configuration in tables["vertex_attribute_to_configuration"].items():
+        location = configuration.get("location")
+        if not isinstance(location, int) or not 0 <= location < MAX_VERTEX_ATTRIBUTE_LOCATIONS:
+            problems.append(f"{attribute} has the location {location!r}, it must be an integer in [0, {MAX_VERTEX_ATTRIBUTE_LOCATIONS}).")
+        elif location in location_to_attribute:
+            problems.append(f"{attribute} and {location_to_attribute[location]} both use location {location}.")
+        else:
+            location_to_attribute[location] = attribute
+
+    texture_unit_to_uniform = {}
+    for uniform, data in tables["shader_uniform_variable_to_data"].items():
+        type_info = glsl_type_to_info.get(data.get("glsl_type"))
+        is_sampler = type_info is not None and type_info.is_opaque
+        texture_unit = data.get("texture_unit")
+        if is_sampler and texture_unit is None:
+            problems.append(f"{uniform} is a {data['glsl_type']} but has no texture_unit.")
+        elif not is_sampler and texture_unit is not None:
+            problems.append(f"{uniform} has a texture_unit but it is not a sampler.")
+        elif texture_unit is not None:
+            if not isinstance(texture_unit, int) or not 0 <= texture_unit < MAX_TEXTURE_UNITS:
+                problems.append(f"{uniform} has the texture_unit {texture_unit!r}, it must be an integer in [0, {MAX_TEXTURE_UNITS}).")
+            elif texture_unit in texture_unit_to_uniform:
+                problems.append(f"{uniform} and {texture_unit_to_uniform[texture_unit]} both use texture_unit {texture_unit}.")
+            else:
+                texture_unit_to_uniform[texture_unit] = uniform
+
+    uniform_to_block = {}
+    binding_to_block = {}
+    glsl_name_to_block = {}
+    for block, block_data in tables["shader_uniform_block_to_data"].items():
+        binding = block_data.get("binding")
+        if not isinstance(binding, int) or binding < 1:
+            problems.append(f"shader_uniform_block_to_data.{block} has the binding {binding!r}, it must be an integer of at least 1.")
+        elif binding in binding_to_block:
+            problems.append(f"{block} and {binding_to_block[binding]} both use the uniform block binding {binding}.")
+        else:
+            binding_to_block[binding] = block
+
+        glsl_name = block_data.get("glsl_name")
+        if glsl_name in glsl_name_to_block:
+            problems.append(f"{block} and {glsl_name_to_block[glsl_name]} both have the glsl name {glsl_name}.")
+        glsl_name_to_block[glsl_name] = block
+
+        for member in block_data.get("members", []):
+            data = tables["shader_uniform_variable_to_data"].get(member)
+            if data is None:
+                problems.append(f"{member} in block {block} has no entry in shader_uniform_variable_to_data.")
+                continue
+            type_info = glsl_type_to_info.get(data.get("glsl_type"))
+            if type_info is None or type_info.std140_size == 0:
+                problems.append(f"{member} in block {block} is a {data.get('glsl_type')} which can't be mirrored in a std140 block.")
+            if member in uniform_to_block:
+                problems.append(f"{member} is a member of both {block} and {uniform_to_block[member]}.")
+            uniform_to_block[member] = block
+
+    return problems
+
+
+def compile_definition(definition: dict, enum_names: List[str], table_to_schema, record_to_type) -> dict:
+    """
+    Validates a definition and compiles it into a registry, all problems are reported at once.
+    :param definition: The parsed contents of the definition file.
+    :param enum_names: The top level lists that become enums.
+    :param table_to_schema: Maps each table to the enum its keys come from and the dataclass of its values.
+    :param record_to_type: Maps each top level record to its dataclass.
+    """
+    problems = []
+
+    expected_keys = set(enum_names) | set(table_to_schema) | set(record_to_type)
+    for key in definition:
+        if key not in expected_keys:
+            problems.append(f"'{key}' is not part of the standard, expected one of {sorted(expected_keys)}.")
+
+    enums = {}
+    for enum_name in enum_names:
+        members = definition.get(enum_name)
+        if not isinstance(members, list):
+            problems.append(f"'{enum_name}' must be a list of names.")
+            continue
+        seen = set()
+        for member in members:
+            if not isinstance(member, str) or not member.isidentifier():
+                problems.append(f"{enum_name} has the invalid name {member!r}.")
+            elif member in seen:
+                problems.append(f"{enum_name} lists {member} more than once.")
+            seen.add(member)
+        enums[enum_name] = list(dict.fromkeys(members))
+
+    def compile_entry(location: str, values, value_type) -> dict:
+        if not isinstance(values, dict):
+            problems.append(f"{location} must be a table.")
+            return {}
+        entry = {}
+        field_names = [field.name for field in fields(value_type)]
+        for unknown in [name for name in values if name not in field_names]:
+            problems.append(f"{location} has the unknown field '{unknown}', expected some of {field_names}.")
+        for field in fields(value_type):
+            if field.name in values:
+                entry[field.name] = values[field.name]
+            elif field.default is not MISSING:
+                entry[field.name] = field.default
+            else:
+                problems.append(f"{location} is missing the field '{field.name}'.")
+        return entry
+
+    tables = {}
+    for table, (key_enum, value_type) in table_to_schema.items():
+        key_to_values = definition.get(table, {})
+        valid_keys = set(enums.get(key_enum, []))
+        tables[table] = {}
+        for key, values in key_to_values.items():
+            if key not in valid_keys:
+                problems.append(f"{table}.{key} is not listed in {key_enum}.")
+            tables[table][key] = compile_entry(f"{table}.{key}", values, value_type)
+
+    records = {}
+    for record, value_type in record_to_type.items():
+        records[record] = compile_entry(record, definition.get(record, {}), value_type)
+
+    for shader_type in enums.get("shader_types", []):
+        if shader_type not in tables["shader_catalog"]:
+            problems.append(f"{shader_type} has no entry in shader_catalog.")
+    for attribute in enums.get("shader_vertex_attribute_variables", []):
+        if attribute not in tables["shader_vertex_attribute_to_data"]:
+            problems.append(f"{attribute} has no entry in shader_vertex_attribute_to_data.")
+    problems += find_conflicts(tables)
+
+    if problems:
+        raise StandardDefinitionError("The standard has problems:\n" + "\n".join(f"  {problem}" for problem in problems))
+
+    return {"enums": enums, "tables": tables, "records": records}
+
+
+def get_code_signature() -> int:
+    """
+    A hash of the modules holding the rules, so a snapshot made before a rule changed isn't trusted.
+    """
+    code_hash = 0
+    for module_name in rule_module_names:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{module_name}.py"), "rb") as module_file:
+            code_hash = zlib.crc32(module_file.read(), code_hash)
+    return code_hash
+
+
+def get_snapshot_path(definition_path: str) -> str:
+    directory, filename = os.path.split(os.path.abspath(definition_path))
+    return os.path.join(directory, "__pycache__", f"{filename}.registry.pickle")
+
+
+def get_enum_bucket(member_name: str, bucket_count: int) -> int:
+    # crc32 rather than hash() since hash() of a string changes between runs
+    return zlib.crc32(member_name.encode()) % bucket_count
+
+
+def split_registry_into_parts(registry: dict) -> dict:
+    """
+    Splits the registry into the parts it is stored and read as, eg) ("tables", "shader_catalog").
+    The members of each enum are also split into buckets of about ENUM_BUCKET_SIZE names mapped to
+    their values, so looking up one member only needs its bucket.
+    """
+    parts = {}
+    for section in ("enums", "tables", "records"):
+        for name, value in registry[section].items():
+            parts[(section, name)] = value
+
+    for name, member_names in registry["enums"].items():
+        bucket_count = max(1, -(-len(member_names) // ENUM_BUCKET_SIZE))
+        buckets = [{} for _ in range(bucket_count)]
+        for value, member_name in enumerate(member_names, start=1):
+            buckets[get_enum_bucket(member_name, bucket_count)][member_name] = value
+        parts[("enum_bucket_counts", name)] = bucket_count
+        for bucket, member_name_to_value in enumerate(buckets):
+            parts[("enum_buckets", name, bucket)] = member_name_to_value
+    return parts
+
+
+def write_snapshot(snapshot_path: str, stamp, parts: dict):
+    """
+    Stores every part of the registry pickled on its own behind the stamp and an index of where each
+    part starts, so one part can be read without the rest.
+    """
+    part_to_data = {part: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL) for part, value in parts.items()}
+    index = {}
+    offset = 0
+    for part, data in part_to_data.items():
+        index[part] = (offset, len(data))
+        offset += len(data)
+
+    os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+    temporary_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as snapshot_file:
+        pickle.dump(stamp, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(index, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+        for data in part_to_data.values():
+            snapshot_file.write(data)
+    os.replace(temporary_path, snapshot_path)
+
+
+def read_snapshot(snapshot_path: str, stamp, part=None):
+    """
+    :return: None when the snapshot is missing or out of date, otherwise the part that was asked for,
+        or True when no part was asked for.
+    """
+    try:
+        with open(snapshot_path, "rb") as snapshot_file:
+            if pickle.load(snapshot_file) != stamp:
+                return None
+            index = pickle.load(snapshot_file)
+            if part is None:
+                return True
+            offset, length = index[part]
+            snapshot_file.seek(snapshot_file.tell() + offset)
+            return pickle.loads(snapshot_file.read(length))
+    except (OSError, pickle.UnpicklingError, EOFError, TypeError, AttributeError, KeyError, ValueError):
+        return None
+
+
+class Registry:
+    """
+    The compiled registry of a definition, each part, eg) ("enums", "shader_types"), is only read from
+    the snapshot the first time it's asked for, so loading costs the same no matter how big the
+    standard is.
+    """
+
+    def __init__(self, snapshot_path: str, stamp, compile_registry: Callable[[], dict]):
+        self.snapshot_path = snapshot_path
+        self.stamp = stamp
+        self.compile_registry = compile_registry
+        # every part, only set when the registry had to be compiled
+        self.compiled_parts = None
+        self.part_to_value = {}
+
+    def get(self, *part):
+        if part not in self.part_to_value:
+            value = None if self.compiled_parts is not None else read_snapshot(self.snapshot_path, self.stamp, part)
+            if value is None:
+                # the snapshot could have been removed or replaced since it was checked
+                if self.compiled_parts is None:
+                    self.compiled_parts = split_registry_into_parts(self.compile_registry())
+                value = self.compiled_parts[part]
+            self.part_to_value[part] = value
+        return self.part_to_value[part]
+
+    def get_enum_member_value(self, enum_name: str, member_name: str) -> Optional[int]:
+        bucket = get_enum_bucket(member_name, self.get("enum_bucket_counts", enum_name))
+        return self.get("enum_buckets", enum_name, bucket).get(member_name)
+
+
+def load_registry(definition_path: str, enum_names: List[str], table_to_schema, record_to_type) -> Registry:
+    """
+    Makes sure a definition has an up to date compiled registry, compiling it and storing a new
+    snapshot only when the definition changed since the last snapshot was made, so a broken definition
+    is reported right away.
+    """
+    definition_stat = os.stat(definition_path)
+    stamp = (
+        REGISTRY_FORMAT_VERSION,
+        definition_stat.st_mtime_ns,
+        definition_stat.st_size,
+        tuple(enum_names),
+        get_schema_signature(table_to_schema, record_to_type),
+        get_code_signature(),
+    )
+
+    snapshot_path = get_snapshot_path(definition_path)
+
+    def compile_registry() -> dict:
+        registry = compile_definition(read_definition(definition_path), enum_names, table_to_schema, record_to_type)
+        # a missing snapshot only costs time, so failing to write one is not an error
+        try:
+            write_snapshot(snapshot_path, stamp, split_registry_into_parts(registry))
+        except OSError:
+            pass
+        return registry
+
+    registry = Registry(snapshot_path, stamp, compile_registry)
+    if read_snapshot(snapshot_path, stamp) is None:
+        registry.compiled_parts = split_registry_into_parts(compile_registry())
+    return registry
+
+
+class RegistryEnumMember:
+    """
+    A member of an enum made by create_registry_enum, it behaves like a member of an enum.Enum.
+    """
+    __slots__ = ("name", "value")
+
+    def __repr__(self):
+        return f"<{type(self).__name__}.{self.name}: {self.value}>"
+
+    def __str__(self):
+        return f"{type(self).__name__}.{self.name}"
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __reduce__(self):
+        return getattr, (type(self), self.name)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class RegistryEnumMembers(Mapping):
+    """
+    What __members__ gives for an enum made by create_registry_enum, looking up one name only makes
+    that member.
+    """
+
+    def __init__(self, enum_class):
+        self.enum_class = enum_class
+
+    def __getitem__(self, name):
+        return self.enum_class[name]
+
+    def __iter__(self):
+        return iter(self.enum_class._get_member_names())
+
+    def __len__(self):
+        return len(self.enum_class)
+
+    def __contains__(self, name):
+        return isinstance(name, str) and self.enum_class._get_member_value(name) is not None
+
+
+class RegistryEnumType(type):
+    """
+    Enums of the standard behave like enum.Enum (ShaderType.TEXT, ShaderType["TEXT"], ShaderType(3),
+    iteration, __members__) but a member is only made the first time it's used, and looking one up
+    only reads the bucket of the snapshot holding its name. Making an enum.Enum costs time for every
+    member, which would make importing the standard slower the bigger it gets.
+    """
+
+    def __getitem__(cls, name: str):
+        member = cls._name_to_member.get(name)
+        if member is None:
+            value = cls._get_member_value(name) if isinstance(name, str) else None
+            if value is None:
+                raise KeyError(name)
+            member = object.__new__(cls)
+            member.name = name
+            member.value = value
+            cls._name_to_member[name] = member
+        return member
+
+    def __getattr__(cls, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return cls[name]
+        except KeyError:
+            raise AttributeError(f"type object '{cls.__name__}' has no attribute '{name}'") from None
+
+    def __call__(cls, value: int):
+        names = cls._get_member_names()
+        if not isinstance(value, int) or not 1 <= value <= len(names):
+            raise ValueError(f"{value!r} is not a valid {cls.__name__}")
+        return cls[names[value - 1]]
+
+    def __iter__(cls):
+        return (cls[name] for name in cls._get_member_names())
+
+    def __reversed__(cls):
+        return (cls[name] for name in reversed(cls._get_member_names()))
+
+    def __len__(cls):
+        return len(cls._get_member_names())
+
+    def __bool__(cls):
+        return True
+
+    def __contains__(cls, member):
+        return isinstance(member, cls)
+
+    def __repr__(cls):
+        return f"<enum '{cls.__name__}'>"
+
+    @property
+    def __members__(cls):
+        return RegistryEnumMembers(cls)
+
+
+def create_registry_enum(name: str, registry: Registry, registry_name: str, module: str):
+    """
+    Makes an enum of the members listed under registry_name in the registry, numbered from 1 like the
+    functional api of enum.Enum does.
+    """
+    return RegistryEnumType(name, (RegistryEnumMember,), {
+        "__slots__": (),
+        "__module__": module,
+        "_get_member_names": staticmethod(lambda: registry.get("enums", registry_name)),
+        "_get_member_value": staticmethod(lambda member_name: registry.get_enum_member_value(registry_name, member_name)),
+        "_name_to_member": {},
+    })
+
+
+class LazyTable(Mapping):
+    """
+    A read only dictionary that is only built the first time it's used.
+    """
+
+    def __init__(self, build_table: Callable[[], dict]):
+        self.build_table = build_table
+        self.table = None
+
+    def get_table(self) -> dict:
+        if self.table is None:
+            self.table = self.build_table()
+        return self.table
+
+    def __getitem__(self, key):
+        return self.get_table()[key]
+
+    def __iter__(self):
+        return iter(self.get_table())
+
+    def __len__(self):
+        return len(self.get_table())
+
+    def __contains__(self, key):
+        return key in self.get_table()
+
+    def __repr__(self):
+        return repr(self.get_table())
+
+
+def time_cached_import(definition_path: str, uniform_name: str, runs: int = 5) -> float:
+    """
+    The fastest of several imports of standard.py in fresh interpreters once the snapshot of the
+    definition exists, in seconds.
+    """
+    import subprocess
+
+    environment = dict(os.environ, SHADER_STANDARD_DEFINITION=definition_path)
+    # time it the way it normally runs, with the bytecode of the tool cached
+    environment.pop("PYTHONDONTWRITEBYTECODE", None)
+    # the standard library modules are imported first so only the work of loading the standard is timed,
+    # the tools star import the standard and then use it, so that's what is timed
+    timed_code = (
+        "from standard import *; "
+        "shader_type = next(iter(ShaderType)); shader_catalog.get(shader_type); "
+        f"ShaderUniformVariable.{uniform_name}; default_shader_cost_budget"
+    )
+    command = [
+        sys.executable,
+        "-c",
+        f"import time, dataclasses, typing, pickle, zlib, collections.abc; start = time.perf_counter(); {timed_code}; print(time.perf_counter() - start)",
+    ]
+    tool_directory = os.path.dirname(os.path.abspath(__file__))
+    # the first import makes the snapshot
+    subprocess.run(command, env=environment, cwd=tool_directory, check=True, stdout=subprocess.DEVNULL)
+    return min(
+        float(subprocess.run(command, env=environment, cwd=tool_directory, check=True, capture_output=True, text=True).stdout)
+        for _ in range(runs)
+    )
+
+
+def check_startup_is_flat(definition_path: str, extra_uniform_count: int) -> bool:
+    """
+    Compares star importing standard.py and looking up a shader type, its catalog entry and a uniform,
+    with the definition against the same definition plus many made up uniforms, none of that should
+    get slower as the standard grows.
+    """
+    import tempfile
+    import json
+
+    definition = read_definition(definition_path)
+    extra_uniforms = [f"BENCHMARK_UNIFORM_{index}" for index in range(extra_uniform_count)]
+    definition["shader_uniform_variables"] = definition["shader_uniform_variables"] + extra_uniforms
+    definition["shader_uniform_variable_to_data"] = {
+        **definition["shader_uniform_variable_to_data"], **{uniform: {"glsl_type": "float"} for uniform in extra_uniforms}
+    }
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        large_definition_path = os.path.join(temporary_directory, "large_standard.json")
+        with open(large_definition_path, "w") as large_definition_file:
+            json.dump(definition, large_definition_file)
+        uniform_name = definition["shader_uniform_variables"][0]
+        small_time = time_cached_import(os.path.abspath(definition_path), uniform_name)
+        large_time = time_cached_import(large_definition_path, uniform_name)
+
+    # some slack for noise, the snapshot itself still has to be read
+    is_flat = large_time <= small_time * 1.5 + 0.002
+    print(
+        f"cached star import: {small_time * 1000:.2f}ms as defined, {large_time * 1000:.2f}ms with {extra_uniform_count} extra uniforms, "
+        f"{'flat' if is_flat else 'NOT flat'}"
+    )
+    return is_flat
+
+
+if __name__ == "__main__":
+    import standard_registry
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Check a definition of the standard")
+    parser.add_argument("definition", nargs="?", help="The .toml or .json definition to check, defaults to the one standard.py uses")
+    parser.add_argument(
+        "--benchmark",
+        "-b",
+        type=int,
+        metavar="EXTRA_UNIFORMS",
+        help="Also check that importing standard.py doesn't slow down when this many uniforms are added"
+    )
+    args = parser.parse_args()
+
+    # compiling through standard.py makes sure the same schema is used as everywhere else
+    if args.definition:
+        os.environ["SHADER_STANDARD_DEFINITION"] = args.definition
+
+    start = time.perf_counter()
+    try:
+        import standard
+        # the enums are built on first use, so use them to make sure the whole definition loads
+        shader_type_count = len(standard.ShaderType)
+    except standard_registry.StandardDefinitionError as error:
+        print(error)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{standard.standard_definition_path} is valid: {shader_type_count} shader types, "
+        f"{len(standard.ShaderUniformVariable)} uniforms and {len(standard.ShaderVertexAttributeVariable)} vertex attributes, "
+        f"loaded in {elapsed * 1000:.2f}ms"
+    )
+
+    if args.benchmark is not None and not check_startup_is_flat(standard.standard_definition_path, args.benchmark):
+        sys.exit(1)
@@ -0,0 +1,5 @@
+import sys
+import os
+
+# the tools are flat modules next to this directory, eg) from standard import *
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,171 @@
+import pytest
+
+from shader_cost import estimate_stage_cost, get_loop_iteration_count, get_operator_alu_cost, find_end_of_statement, for_loop_pattern
+
+POINT_LIGHT_HEADER = """
+#version 330 core
+#define NR_POINT_LIGHTS 4
+uniform sampler2D diffuse;
+uniform vec3 light_positions[NR_POINT_LIGHTS];
+in vec2 uv;
+in vec3 normal;
+out vec4 frag_color;
+"""
+
+
+def get_fragment_cost(body: str):
+    return estimate_stage_cost(POINT_LIGHT_HEADER + body, False)
+
+
+@pytest.mark.parametrize("header, constants, iterations", [
+    (("int i = 0", " i < 4", " i++"), {}, 4),
+    (("int i = 1", " i <= 4", " i++"), {}, 4),
+    (("int i = 0", " i < NR_POINT_LIGHTS", " i++"), {"NR_POINT_LIGHTS": 16}, 16),
+    (("int i = 0", " i < 4u", " i++"), {}, 4),
+    (("int i = 5", " i < 4", " i++"), {}, 0),
+    (("int i = 0", " i < count", " i++"), {}, None),
+    (("int i = 0", " i != 4", " i++"), {}, None),
+])
+def test_loop_trip_count(header, constants, iterations):
+    assert get_loop_iteration_count(header, constants) == iterations
+
+
+def test_end_of_unbraced_nested_loop():
+    code = "for (int i = 0; i < 2; i++) for (int j = 0; j < 3; j++) a += b; c += d;"
+    loop_match = for_loop_pattern.search(code)
+    assert code[:find_end_of_statement(code, loop_match.end())] == "for (int i = 0; i < 2; i++) for (int j = 0; j < 3; j++) a += b;"
+
+
+def test_loop_multiplies_texture_samples():
+    cost = get_fragment_cost("""
+void main() {
+    vec4 color = vec4(0.0);
+    for (int i = 0; i < NR_POINT_LIGHTS; i++) {
+        color += texture(diffuse, uv);
+    }
+    frag_color = color;
+}
+""")
+    assert cost.texture_samples == 4
+    assert cost.loop_iterations == 4
+    assert cost.unbounded_loops == 0
+
+
+def test_nested_loops_multiply():
+    cost = get_fragment_cost("""
+void main() {
+    vec4 color = vec4(0.0);
+    for (int i = 0; i < NR_POINT_LIGHTS; i++)
+        for (int j = 0; j < 3; j++)
+            color += texture(diffuse, uv);
+    frag_color = color;
+}
+""")
+    assert cost.texture_samples == 12
+    # the inner loop runs its 3 iterations once per iteration of the outer one
+    assert cost.loop_iterations == 4 + 12
+
+
+def test_unknown_bound_is_an_unbounded_loop():
+    cost = get_fragment_cost("""
+uniform int count;
+void main() {
+    vec4 color = vec4(0.0);
+    for (int i = 0; i < count; i++) color += texture(diffuse, uv);
+    frag_color = color;
+}
+""")
+    assert cost.unbounded_loops == 1
+    assert cost.texture_samples == 1
+
+
+def test_helper_called_from_a_loop_is_weighted_by_the_loop():
+    inline_cost = get_fragment_cost("""
+void main() {
+    vec3 result = vec3(0.0);
+    for (int i = 0; i < NR_POINT_LIGHTS; i++) {
+        vec3 direction = normalize(light_positions[i] - normal);
+        result += max(dot(normal, direction), 0.0) * texture(diffuse, uv).rgb;
+    }
+    frag_color = vec4(result, 1.0);
+}
+""")
+    helper_cost = get_fragment_cost("""
+vec3 calc_point_light(vec3 light_position) {
+    vec3 direction = normalize(light_position - normal);
+    return max(dot(normal, direction), 0.0) * texture(diffuse, uv).rgb;
+}
+void main() {
+    vec3 result = vec3(0.0);
+    for (int i = 0; i < NR_POINT_LIGHTS; i++) {
+        result += calc_point_light(light_positions[i]);
+    }
+    frag_color = vec4(result, 1.0);
+}
+""")
+    assert helper_cost.texture_samples == inline_cost.texture_samples == 4
+    assert helper_cost.loop_iterations == inline_cost.loop_iterations == 4
+    assert helper_cost.alu_operations == inline_cost.alu_operations
+
+
+def test_helpers_calling_helpers_and_unused_helpers():
+    cost = get_fragment_cost("""
+vec4 sample_diffuse() {
+    return texture(diffuse, uv);
+}
+vec4 sample_twice() {
+    return sample_diffuse() + sample_diffuse();
+}
+vec4 never_called() {
+    return texture(diffuse, uv) + texture(diffuse, uv);
+}
+void main() {
+    vec4 color = vec4(0.0);
+    for (int i = 0; i < NR_POINT_LIGHTS; i++) color += sample_twice();
+    frag_color = color;
+}
+""")
+    assert cost.texture_samples == 8
+
+
+def test_prototype_is_not_a_call():
+    cost = get_fragment_cost("""
+vec4 sample_diffuse();
+void main() {
+    frag_color = sample_diffuse();
+}
+vec4 sample_diffuse() {
+    return texture(diffuse, uv);
+}
+""")
+    assert cost.texture_samples == 1
+
+
+@pytest.mark.parametrize("left_type, right_type, alu_cost", [
+    (None, None, 1),
+    ("float", "float", 1),
+    ("vec3", "vec3", 3),
+    ("float", "vec4", 4),
+    ("mat4", "vec4", 16),
+    ("vec4", "mat4", 16),
+    ("mat3", "mat3", 27),
+    ("mat4", "float", 16),
+    ("mat4", None, 16),
+])
+def test_operator_cost_scales_with_operand_types(left_type, right_type, alu_cost):
+    assert get_operator_alu_cost(left_type, right_type) == alu_cost
+
+
+def test_matrix_times_vector_counts_every_component():
+    cost = estimate_stage_cost("""
+#version 330 core
+in vec3 xyz_position;
+uniform mat4 camera_to_clip;
+uniform mat4 world_to_camera;
+uniform mat4 local_to_world;
+void main() {
+    gl_Position = camera_to_clip * world_to_camera * local_to_world * vec4(xyz_position, 1.0);
+}
+""", True)
+    # evaluated left to right, two matrix products and then a matrix times a vector
+    assert cost.alu_operations == 64 + 64 + 16
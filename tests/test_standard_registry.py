@@ -0,0 +1,225 @@
+import copy
+import json
+import os
+import pickle
+import shutil
+from dataclasses import dataclass
+from typing import Optional
+
+import pytest
+
+import standard
+import standard_registry
+from standard_registry import (
+    LazyTable,
+    StandardDefinitionError,
+    compile_definition,
+    create_registry_enum,
+    find_conflicts,
+    get_snapshot_path,
+    load_registry,
+    read_definition,
+    read_snapshot,
+)
+
+
+def get_standard_definition() -> dict:
+    return read_definition(standard.standard_definition_path)
+
+
+def compile_standard(definition: dict) -> dict:
+    return compile_definition(definition, standard._enum_names, standard._table_to_schema, standard._record_to_type)
+
+
+def load_standard(definition_path: str):
+    return load_registry(definition_path, standard._enum_names, standard._table_to_schema, standard._record_to_type)
+
+
+def get_problems(definition: dict) -> str:
+    with pytest.raises(StandardDefinitionError) as error:
+        compile_standard(definition)
+    return str(error.value)
+
+
+@pytest.fixture
+def definition_path(tmp_path):
+    path = tmp_path / "standard.toml"
+    shutil.copy(standard.standard_definition_path, path)
+    return str(path)
+
+
+def test_the_standard_compiles():
+    registry = compile_standard(get_standard_definition())
+    assert "TEXT" in registry["enums"]["shader_types"]
+    assert registry["tables"]["shader_catalog"]["TEXT"]["vertex_shader_filename"] == "out/text.vert"
+
+
+def test_duplicate_json_key_is_rejected(tmp_path):
+    path = tmp_path / "standard.json"
+    path.write_text('{"shader_types": ["TEXT"], "shader_types": ["TEXT"]}')
+    with pytest.raises(StandardDefinitionError, match="shader_types"):
+        read_definition(str(path))
+
+
+def test_duplicate_toml_key_is_rejected(tmp_path):
+    path = tmp_path / "standard.toml"
+    path.write_text('[shader_catalog]\nTEXT = { vertex_shader_filename = "a", fragment_shader_filename = "b" }\nTEXT = { vertex_shader_filename = "a", fragment_shader_filename = "b" }\n')
+    with pytest.raises(StandardDefinitionError):
+        read_definition(str(path))
+
+
+def test_enum_member_listed_twice_is_rejected():
+    definition = get_standard_definition()
+    definition["shader_types"].append("TEXT")
+    assert "shader_types lists TEXT more than once" in get_problems(definition)
+
+
+def test_conflicting_component_count_is_rejected():
+    definition = get_standard_definition()
+    definition["vertex_attribute_to_configuration"]["XYZ_POSITION"]["components_per_vertex"] = "2"
+    assert "XYZ_POSITION is a vec3 but its configuration has 2 components per vertex" in get_problems(definition)
+
+
+def test_conflicting_component_type_is_rejected():
+    problems = find_conflicts({
+        "shader_vertex_attribute_to_data": {"BONE_IDS": {"glsl_type": "ivec4"}},
+        "vertex_attribute_to_configuration": {"BONE_IDS": {"components_per_vertex": "4", "data_type_of_component": "GL_FLOAT", "location": 0}},
+        "shader_uniform_variable_to_data": {},
+        "shader_uniform_block_to_data": {},
+    })
+    assert problems == ["BONE_IDS is a ivec4 but its configuration uses GL_FLOAT components."]
+
+
+def test_shared_texture_unit_is_rejected():
+    problems = find_conflicts({
+        "shader_vertex_attribute_to_data": {},
+        "vertex_attribute_to_configuration": {},
+        "shader_uniform_variable_to_data": {
+            "DIFFUSE_MAP": {"glsl_type": "sampler2D", "texture_unit": 1},
+            "SPECULAR_MAP": {"glsl_type": "sampler2D", "texture_unit": 1},
+        },
+        "shader_uniform_block_to_data": {},
+    })
+    assert problems == ["SPECULAR_MAP and DIFFUSE_MAP both use texture_unit 1."]
+
+
+def test_texture_unit_on_a_non_sampler_is_rejected():
+    definition = get_standard_definition()
+    definition["shader_uniform_variable_to_data"]["LOCAL_TO_WORLD"]["texture_unit"] = 3
+    assert "LOCAL_TO_WORLD has a texture_unit but it is not a sampler" in get_problems(definition)
+
+
+def test_shared_vertex_attribute_location_is_rejected():
+    definition = get_standard_definition()
+    definition["vertex_attribute_to_configuration"]["XY_POSITION"]["location"] = 0
+    assert "XY_POSITION and XYZ_POSITION both use location 0" in get_problems(definition)
+
+
+def test_uniform_in_two_blocks_is_rejected():
+    definition = get_standard_definition()
+    blocks = definition["shader_uniform_block_to_data"]
+    block_name, block_data = next(iter(blocks.items()))
+    blocks["COPY"] = {**copy.deepcopy(block_data), "glsl_name": "Copy", "binding": 100}
+    definition["shader_uniform_blocks"].append("COPY")
+    assert f"{block_data['members'][0]} is a member of both COPY and {block_name}" in get_problems(definition)
+
+
+def test_snapshot_is_written_and_read_back(definition_path):
+    load_standard(definition_path)
+    snapshot_path = get_snapshot_path(definition_path)
+    assert os.path.exists(snapshot_path)
+
+    registry = load_standard(definition_path)
+    assert registry.compiled_parts is None
+    assert "TEXT" in registry.get("enums", "shader_types")
+    assert registry.get("tables", "shader_catalog")["TEXT"]["vertex_shader_filename"] == "out/text.vert"
+
+
+def test_snapshot_is_invalidated_when_the_definition_changes(definition_path):
+    load_standard(definition_path)
+    with open(definition_path) as definition_file:
+        contents = definition_file.read()
+    with open(definition_path, "w") as definition_file:
+        definition_file.write(contents.replace('"out/text.vert"', '"out/text_changed.vert"'))
+
+    registry = load_standard(definition_path)
+    assert registry.compiled_parts is not None
+    assert registry.get("tables", "shader_catalog")["TEXT"]["vertex_shader_filename"] == "out/text_changed.vert"
+    # and the new snapshot is the one read from now on
+    assert load_standard(definition_path).get("tables", "shader_catalog")["TEXT"]["vertex_shader_filename"] == "out/text_changed.vert"
+
+
+def test_snapshot_is_invalidated_when_the_rules_change(definition_path, monkeypatch):
+    old_registry = load_standard(definition_path)
+    assert read_snapshot(old_registry.snapshot_path, old_registry.stamp) is True
+
+    monkeypatch.setattr(standard_registry, "get_code_signature", lambda: -1)
+    new_registry = load_standard(definition_path)
+    assert new_registry.compiled_parts is not None
+    assert read_snapshot(old_registry.snapshot_path, old_registry.stamp) is None
+    assert read_snapshot(new_registry.snapshot_path, new_registry.stamp) is True
+
+
+def test_snapshot_is_invalidated_when_the_schema_changes(definition_path):
+    @dataclass
+    class ShaderCostBudgetWithExtraField(standard.ShaderCostBudget):
+        max_extra: Optional[int] = None
+
+    registry = load_standard(definition_path)
+    record_to_type = {"default_shader_cost_budget": ShaderCostBudgetWithExtraField}
+    new_registry = load_registry(definition_path, standard._enum_names, standard._table_to_schema, record_to_type)
+    assert new_registry.compiled_parts is not None
+    assert read_snapshot(registry.snapshot_path, registry.stamp) is None
+
+
+def test_broken_definition_is_reported_on_load(definition_path):
+    load_standard(definition_path)
+    with open(definition_path) as definition_file:
+        contents = definition_file.read()
+    with open(definition_path, "w") as definition_file:
+        definition_file.write(contents.replace("location = 1 }", "location = 0 }", 1))
+
+    with pytest.raises(StandardDefinitionError, match="both use location 0"):
+        load_standard(definition_path)
+
+
+def test_lazy_enum_behaves_like_an_enum(tmp_path):
+    path = tmp_path / "standard.json"
+    definition = get_standard_definition()
+    # enough members to spread them over several buckets
+    definition["shader_uniform_variables"] += [f"EXTRA_{i}" for i in range(3 * standard_registry.ENUM_BUCKET_SIZE)]
+    definition["shader_uniform_variable_to_data"].update({f"EXTRA_{i}": {"glsl_type": "float"} for i in range(3 * standard_registry.ENUM_BUCKET_SIZE)})
+    path.write_text(json.dumps(definition))
+
+    registry = load_standard(str(path))
+    Uniform = create_registry_enum("Uniform", registry, "shader_uniform_variables", __name__)
+    member_names = registry.get("enums", "shader_uniform_variables")
+
+    assert len(Uniform) == len(member_names)
+    assert [member.name for member in Uniform] == member_names
+    assert Uniform.EXTRA_700 is Uniform["EXTRA_700"]
+    assert Uniform.EXTRA_700.value == member_names.index("EXTRA_700") + 1
+    assert Uniform(Uniform.EXTRA_700.value) is Uniform.EXTRA_700
+    assert isinstance(Uniform.EXTRA_700, Uniform)
+    assert Uniform.EXTRA_700 in Uniform
+    assert "EXTRA_700" in Uniform.__members__ and "MISSING" not in Uniform.__members__
+    with pytest.raises(KeyError):
+        Uniform["MISSING"]
+    with pytest.raises(AttributeError):
+        Uniform.MISSING
+    with pytest.raises(ValueError):
+        Uniform(0)
+
+
+def test_enum_members_survive_pickling():
+    assert pickle.loads(pickle.dumps(standard.ShaderType.TEXT)) is standard.ShaderType.TEXT
+    assert copy.deepcopy({standard.ShaderType.TEXT: 1}) == {standard.ShaderType.TEXT: 1}
+
+
+def test_lazy_table_is_built_on_first_use():
+    build_count = []
+    table = LazyTable(lambda: build_count.append(1) or {"TEXT": 1})
+    assert build_count == []
+    assert table["TEXT"] == 1
+    assert dict(table) == {"TEXT": 1}
+    assert build_count == [1]
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from standard import ShaderUniformVariable, ShaderUniformBlock, ShaderUniformBlockData, shader_uniform_block_to_data
+from main import generate_uniform_block_struct
+
+# members of the standard with the types the layout depends on
+VEC3_UNIFORM = ShaderUniformVariable.CAMERA_POSITION
+OTHER_VEC3_UNIFORM = ShaderUniformVariable.LIGHT_POSITION
+FLOAT_UNIFORM = ShaderUniformVariable.AMBIENT_LIGHT_STRENGTH
+MAT4_UNIFORM = ShaderUniformVariable.CAMERA_TO_CLIP
+
+
+def generate_test_block(members):
+    return generate_uniform_block_struct(SimpleNamespace(name="TEST"), ShaderUniformBlockData("Test", 7, members))
+
+
+def test_float_after_vec3_fills_its_last_four_bytes():
+    lines = generate_test_block([VEC3_UNIFORM, FLOAT_UNIFORM])
+    assert "static_assert(offsetof(TestUniformBlock, camera_position) == 0, \"TestUniformBlock must match the std140 layout\");" in lines
+    assert "static_assert(offsetof(TestUniformBlock, ambient_light_strength) == 12, \"TestUniformBlock must match the std140 layout\");" in lines
+    assert "static_assert(sizeof(TestUniformBlock) == 16, \"TestUniformBlock must match the std140 layout\");" in lines
+    assert not any("padding" in line for line in lines)
+
+
+def test_vec3_after_vec3_starts_on_the_next_vec4():
+    lines = generate_test_block([VEC3_UNIFORM, OTHER_VEC3_UNIFORM])
+    assert lines[1:5] == [
+        "struct TestUniformBlock {",
+        "    glm::vec3 camera_position;",
+        "    float padding_0[1];",
+        "    glm::vec3 light_position;",
+    ]
+    assert "static_assert(offsetof(TestUniformBlock, light_position) == 16, \"TestUniformBlock must match the std140 layout\");" in lines
+    assert "static_assert(sizeof(TestUniformBlock) == 32, \"TestUniformBlock must match the std140 layout\");" in lines
+
+
+def test_block_size_is_rounded_up_to_a_vec4():
+    lines = generate_test_block([MAT4_UNIFORM, FLOAT_UNIFORM])
+    assert "    float padding_0[3];" in lines
+    assert "static_assert(sizeof(TestUniformBlock) == 80, \"TestUniformBlock must match the std140 layout\");" in lines
+
+
+def test_binding_constant():
+    assert generate_test_block([FLOAT_UNIFORM])[0] == "constexpr GLuint TEST_UNIFORM_BLOCK_BINDING = 7;"
+
+
+def test_camera_block_of_the_standard():
+    lines = generate_uniform_block_struct(ShaderUniformBlock.CAMERA, shader_uniform_block_to_data[ShaderUniformBlock.CAMERA])
+    assert "static_assert(offsetof(CameraUniformBlock, world_to_camera) == 64, \"CameraUniformBlock must match the std140 layout\");" in lines
+    assert "static_assert(offsetof(CameraUniformBlock, camera_position) == 128, \"CameraUniformBlock must match the std140 layout\");" in lines
+    assert "static_assert(sizeof(CameraUniformBlock) == 144, \"CameraUniformBlock must match the std140 layout\");" in lines
@@ -0,0 +1,280 @@
+from standard import *
+from colored_print import *
+from typing import Dict, Optional
+import numpy as np
+import argparse
+import sys
+import os
+
+"""
+Packs mesh data into the binary vertex and index buffers that a shader type expects
+
+The input is one array per vertex attribute, either a .npy file or a raw file holding the
+components in the type the standard uses for that attribute. The layout of every shader type
+comes from shader_to_vertex_dtype in the generated shader_summary.py, so be sure to run
+
+python main.py --gen-py-shader-summary
+
+first. Everything is processed in chunks of vertices and written through memory maps, so meshes
+that are much larger than the available memory can be packed.
+"""
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# INDEX is an "unsigned int" in the standard
+index_dtype = np.dtype(np.uint32)
+
+
+def load_array(path: str, dtype: np.dtype, components: int) -> np.ndarray:
+    """
+    Memory maps an array from disk and views it as one row of components per vertex.
+    """
+    if path.endswith(".npy"):
+        array = np.load(path, mmap_mode="r")
+    else:
+        array = np.memmap(path, dtype=dtype, mode="r")
+
+    if array.ndim == 1 and (components == 1 or not path.endswith(".npy")):
+        if array.shape[0] % components != 0:
+            raise ValueError(f"'{path}' holds {array.shape[0]} values which isn't a multiple of {components} components.")
+        return array.reshape(-1, components)
+
+    if array.ndim != 2 or array.shape[1] != components:
+        raise ValueError(f"'{path}' has shape {array.shape} but {components} components per vertex are required.")
+
+    return array
+
+
+def load_attribute_arrays(vertex_dtype: np.dtype, attribute_to_path: Dict[str, str]) -> Dict[str, np.ndarray]:
+    """
+    Loads every attribute the vertex layout needs and makes sure they describe the same vertices.
+    """
+    missing_attributes = [name for name in vertex_dtype.names if name not in attribute_to_path]
+    if missing_attributes:
+        raise ValueError(f"Missing data for the vertex attributes {missing_attributes}.")
+
+    unused_attributes = [name for name in attribute_to_path if name not in vertex_dtype.names]
+    if unused_attributes:
+        raise ValueError(f"The vertex attributes {unused_attributes} are not used by this shader type, valid attributes are {list(vertex_dtype.names)}.")
+
+    attribute_to_array = {}
+    for name in vertex_dtype.names:
+        field_dtype = vertex_dtype.fields[name][0]
+        components = field_dtype.shape[0] if field_dtype.shape else 1
+        array = load_array(attribute_to_path[name], field_dtype.base, components)
+        # numpy defaults to int64 so any integer type is taken for integer attributes, the values are
+        # range checked before anything is written
+        is_integer_to_integer = array.dtype.kind in "iu" and field_dtype.base.kind in "iu"
+        if not is_integer_to_integer and not np.can_cast(array.dtype, field_dtype.base, casting="same_kind"):
+            raise ValueError(f"Attribute '{name}' has type {array.dtype} which can't be converted to {field_dtype.base}.")
+        attribute_to_array[name] = array
+
+    vertex_counts = {name: array.shape[0] for name, array in attribute_to_array.items()}
+    if len(set(vertex_counts.values())) > 1:
+        raise ValueError(f"Every attribute needs the same number of vertices but found {vertex_counts}.")
+
+    return attribute_to_array
+
+
+def get_value_range(array: np.ndarray, chunk_size: int):
+    """
+    The smallest and largest value of an array, read a chunk at a time so memory maps aren't loaded whole.
+    """
+    minimum, maximum = None, None
+    for start in range(0, array.shape[0], chunk_size):
+        chunk = array[start:start + chunk_size]
+        if chunk.size == 0:
+            continue
+        minimum = chunk.min() if minimum is None else min(minimum, chunk.min())
+        maximum = chunk.max() if maximum is None else max(maximum, chunk.max())
+    return minimum, maximum
+
+
+def check_integer_range(name: str, array: np.ndarray, dtype: np.dtype, chunk_size: int):
+    """
+    Makes sure converting an integer array to dtype doesn't wrap around.
+    """
+    if array.dtype.kind not in "iu" or dtype.kind not in "iu":
+        return
+    minimum, maximum = get_value_range(array, chunk_size)
+    limits = np.iinfo(dtype)
+    if minimum is not None and (minimum < limits.min or maximum > limits.max):
+        raise ValueError(f"Attribute '{name}' has values in [{minimum}, {maximum}] which don't fit in {dtype}.")
+
+
+def load_indices(index_path: str, vertex_count: int, chunk_size: int) -> np.ndarray:
+    """
+    Loads the indices and makes sure every one of them refers to a vertex.
+    """
+    indices = load_array(index_path, index_dtype, 1).reshape(-1)
+    if indices.dtype.kind not in "iu":
+        raise ValueError(f"Indices in '{index_path}' have type {indices.dtype} but must be integers.")
+    minimum, maximum = get_value_range(indices, chunk_size)
+    if minimum is not None and (minimum < 0 or maximum >= vertex_count):
+        raise ValueError(f"Indices in '{index_path}' must lie in [0, {vertex_count}) but found values in [{minimum}, {maximum}].")
+    return indices
+
+
+def create_output_array(path: str, dtype: np.dtype, shape) -> np.ndarray:
+    if shape[0] == 0:
+        # mapping an empty file isn't possible, so there is nothing to fill in later
+        open(path, "wb").close()
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+
+
+def pack_vertex_buffers(
+    vertex_dtype: np.dtype,
+    attribute_to_path: Dict[str, str],
+    output_directory: str,
+    index_path: Optional[str] = None,
+    interleaved: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, str]:
+    """
+    Writes the vertex buffers (and optionally the index buffer) for one shader type.
+    :param vertex_dtype: The layout of a vertex, usually shader_to_vertex_dtype[shader_type].
+    :param attribute_to_path: Maps each attribute name (eg. xyz_position) to the file holding its data.
+    :param output_directory: Where the binary buffers are written.
+    :param index_path: A file holding the indices, they are checked against the number of vertices.
+    :param interleaved: Write a single buffer of whole vertices instead of one tightly packed buffer
+        per attribute, note that the standard configures attributes with a stride of 0 which expects
+        the latter.
+    :param chunk_size: How many vertices or indices are converted at a time, at least 1.
+    :return: Maps each attribute name, "vertices" when interleaved, and "indices" to the file written.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"The chunk size must be at least 1 but it is {chunk_size}.")
+
+    attribute_to_array = load_attribute_arrays(vertex_dtype, attribute_to_path)
+    vertex_count = next(iter(attribute_to_array.values())).shape[0] if attribute_to_array else 0
+
+    # everything is checked before any output is created, so bad input doesn't leave partial buffers behind
+    for name, array in attribute_to_array.items():
+        check_integer_range(name, array, vertex_dtype.fields[name][0].base, chunk_size)
+    indices = load_indices(index_path, vertex_count, chunk_size) if index_path is not None else None
+
+    os.makedirs(output_directory, exist_ok=True)
+
+    buffer_to_path = {}
+    if interleaved:
+        buffer_to_path["vertices"] = os.path.join(output_directory, "vertices.bin")
+        vertices = create_output_array(buffer_to_path["vertices"], vertex_dtype, (vertex_count,))
+        for name, array in attribute_to_array.items():
+            destination = vertices[name]
+            if destination.ndim == 1:
+                destination = destination[:, np.newaxis]
+            for start in range(0, vertex_count, chunk_size):
+                destination[start:start + chunk_size] = array[start:start + chunk_size]
+        if isinstance(vertices, np.memmap):
+            vertices.flush()
+    else:
+        for name, array in attribute_to_array.items():
+            buffer_to_path[name] = os.path.join(output_directory, f"{name}.bin")
+            field_dtype = vertex_dtype.fields[name][0]
+            destination = create_output_array(buffer_to_path[name], field_dtype.base, (vertex_count, array.shape[1]))
+            for start in range(0, vertex_count, chunk_size):
+                destination[start:start + chunk_size] = array[start:start + chunk_size]
+            if isinstance(destination, np.memmap):
+                destination.flush()
+
+    if indices is not None:
+        buffer_to_path["indices"] = os.path.join(output_directory, "indices.bin")
+        destination = create_output_array(buffer_to_path["indices"], index_dtype, indices.shape)
+        for start in range(0, indices.shape[0], chunk_size):
+            destination[start:start + chunk_size] = indices[start:start + chunk_size]
+        if isinstance(destination, np.memmap):
+            destination.flush()
+
+    return buffer_to_path
+
+
+def positive_integer(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1 but it is {number}")
+    return number
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack mesh data into the vertex and index buffers of a shader type")
+    parser.add_argument(
+        "--shader-type",
+        "-st",
+        type=str,
+        required=True,
+        help="The ShaderType the buffers are made for eg) CWL_V_TRANSFORMATION_WITH_TEXTURES"
+    )
+    parser.add_argument(
+        "--attribute",
+        "-a",
+        action="append",
+        default=[],
+        metavar="NAME=PATH",
+        help="The .npy or raw file holding the data for one vertex attribute, repeat for each attribute"
+    )
+    parser.add_argument(
+        "--indices",
+        "-i",
+        type=str,
+        help="The .npy or raw (unsigned 32 bit) file holding the indices"
+    )
+    parser.add_argument(
+        "--output-directory",
+        "-od",
+        type=str,
+        required=True,
+        help="Path to the directory the buffers are written to"
+    )
+    parser.add_argument(
+        "--interleaved",
+        action="store_true",
+        help="Write a single interleaved vertex buffer instead of one buffer per attribute"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=positive_integer,
+        default=DEFAULT_CHUNK_SIZE,
+        help="How many vertices are converted at a time"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        from shader_summary import shader_to_vertex_dtype
+    except ImportError:
+        colored_print("Error: shader_summary.py was not found, generate it with 'python main.py --gen-py-shader-summary'.", TextColor.RED)
+        sys.exit(1)
+
+    if args.shader_type not in ShaderType.__members__:
+        colored_print(f"Error: '{args.shader_type}' is not a ShaderType.", TextColor.RED)
+        sys.exit(1)
+    shader_type = ShaderType[args.shader_type]
+
+    if shader_type not in shader_to_vertex_dtype:
+        colored_print(f"Error: {shader_type.name} is not in shader_summary.py, were its shaders found when it was generated?", TextColor.RED)
+        sys.exit(1)
+
+    attribute_to_path = {}
+    for attribute in args.attribute:
+        name, separator, path = attribute.partition("=")
+        if not separator:
+            colored_print(f"Error: '{attribute}' should look like NAME=PATH.", TextColor.RED)
+            sys.exit(1)
+        attribute_to_path[name.lower()] = path
+
+    try:
+        buffer_to_path = pack_vertex_buffers(
+            shader_to_vertex_dtype[shader_type],
+            attribute_to_path,
+            args.output_directory,
+            args.indices,
+            args.interleaved,
+            args.chunk_size,
+        )
+    except (ValueError, OSError) as error:
+        colored_print(f"Error: {error}", TextColor.RED)
+        sys.exit(1)
+
+    for buffer, path in buffer_to_path.items():
+        colored_print(f"Wrote {buffer} to {path}", TextColor.GREEN)